@@ -0,0 +1,233 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Query benchmark
+
+Times the report queries of main.py (sections 5-8) and the list pages of
+app.py against synthetic data at one or more scales (see generate_data.py)
+and writes the timings as JSON, so runs from different commits can be
+compared with --compare.
+
+Loading a scale truncates the seven tables; --replace must be given to
+allow it. With --no-generate the data already in the database is used.
+
+Usage:
+    python benchmark.py --scales 10k,100k,1m --replace --output results.json
+    python benchmark.py --no-generate --repeat 10 --compare results.json
+    DB_PREPARE_STATEMENTS=1 python benchmark.py --no-generate --routes-only --repeat 200
+"""
+
+from collections import namedtuple
+from datetime import datetime, timezone
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import engine
+from generate_data import DEFAULT_SEED, format_scale, generate, parse_scale, row_counts
+from reports import REPORT_QUERIES
+
+# First page of every list route of the web app
+LIST_ROUTES = [
+    '/users',
+    '/caregivers',
+    '/members',
+    '/addresses',
+    '/jobs',
+    '/job_applications',
+    '/job_applications?live=1',
+    '/appointments',
+]
+
+# kind:    'query' (main.py) or 'route' (app.py)
+# status:  'ok', 'timeout' or 'error'
+Timing = namedtuple('Timing', ['kind', 'name', 'status', 'rows', 'runs_ms', 'error'])
+
+
+def summarise(timing):
+    """Timing as a JSON-friendly dict with min/median/mean/max in milliseconds"""
+    result = {'kind': timing.kind, 'name': timing.name, 'status': timing.status,
+              'rows': timing.rows}
+    if timing.runs_ms:
+        result.update({
+            'runs': len(timing.runs_ms),
+            'min_ms': round(min(timing.runs_ms), 3),
+            'median_ms': round(statistics.median(timing.runs_ms), 3),
+            'mean_ms': round(statistics.mean(timing.runs_ms), 3),
+            'max_ms': round(max(timing.runs_ms), 3),
+        })
+    if timing.error:
+        result['error'] = timing.error
+    return result
+
+
+def time_query(key, repeat, timeout_ms):
+    """Run REPORT_QUERIES[key] once to warm up, then repeat times"""
+    sql = text(REPORT_QUERIES[key].sql)
+    runs = []
+    rows = None
+    with engine.connect() as conn:
+        conn.execute(text(f"SET statement_timeout = {int(timeout_ms)}"))
+        try:
+            for run in range(repeat + 1):
+                started = time.perf_counter()
+                rows = len(conn.execute(sql).fetchall())
+                if run:
+                    runs.append((time.perf_counter() - started) * 1000)
+        except OperationalError as e:
+            status = 'timeout' if 'statement timeout' in str(e) else 'error'
+            return Timing('query', key, status, rows, runs, str(e.orig).strip())
+        except Exception as e:
+            return Timing('query', key, 'error', rows, runs, str(e).strip())
+        finally:
+            conn.rollback()
+    return Timing('query', key, 'ok', rows, runs, None)
+
+
+def time_route(client, path, repeat):
+    """GET path once to warm up, then repeat times through the Flask test client"""
+    runs = []
+    for run in range(repeat + 1):
+        started = time.perf_counter()
+        response = client.get(path)
+        body = response.get_data()
+        if run:
+            runs.append((time.perf_counter() - started) * 1000)
+        # List routes flash database errors instead of failing the request
+        if response.status_code != 200 or b'Error: ' in body:
+            return Timing('route', path, 'error', None, runs,
+                          f'HTTP {response.status_code}')
+    return Timing('route', path, 'ok', body.count(b'<tr>') - 1, runs, None)
+
+
+def run_scale(users, args, app):
+    """Load one scale (unless --no-generate) and time everything against it"""
+    result = {}
+    if args.generate:
+        print(f"\nGenerating {format_scale(users)} users (seed {args.seed})...")
+        report = generate(engine, users, args.seed, args.replace)
+        result['generate_seconds'] = round(report.seconds, 3)
+        rows = report.rows
+    else:
+        with engine.connect() as conn:
+            rows = row_counts(conn)
+    result['users'] = rows['users']
+    result['rows'] = rows
+
+    timings = []
+    for key in ([] if args.routes_only else REPORT_QUERIES):
+        timings.append(time_query(key, args.repeat, args.timeout * 1000))
+        print_timing(timings[-1])
+    client = app.test_client()
+    for path in LIST_ROUTES:
+        timings.append(time_route(client, path, args.repeat))
+        print_timing(timings[-1])
+    result['results'] = [summarise(timing) for timing in timings]
+    return result
+
+
+def print_timing(timing):
+    if timing.status != 'ok':
+        print(f"  ✗ {timing.kind:<6} {timing.name:<26} {timing.status}: {timing.error}")
+        return
+    print(f"  {timing.kind:<8} {timing.name:<26} {statistics.median(timing.runs_ms):10.2f} ms"
+          f"  ({timing.rows:,} rows)")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """Print median changes against a baseline file, return the number of regressions"""
+    before = {}
+    for scale in baseline['scales']:
+        for item in scale['results']:
+            before[(scale['users'], item['kind'], item['name'])] = item
+    regressions = 0
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} "
+          f"(regression threshold {threshold:.0%}):")
+    for scale in current['scales']:
+        for item in scale['results']:
+            old = before.get((scale['users'], item['kind'], item['name']))
+            if not old or 'median_ms' not in old or 'median_ms' not in item:
+                continue
+            change = (item['median_ms'] - old['median_ms']) / old['median_ms']
+            flag = ''
+            if change > threshold:
+                flag = '  ← regression'
+                regressions += 1
+            print(f"  {format_scale(scale['users']):>5} {item['name']:<26} "
+                  f"{old['median_ms']:10.2f} → {item['median_ms']:10.2f} ms "
+                  f"({change:+.0%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark report queries and list routes')
+    parser.add_argument('--scales', default='10k',
+                        help='comma-separated user counts, e.g. 10k,100k,1m (default 10k)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per item (default 5)')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='statement timeout per query in seconds (default 60)')
+    parser.add_argument('--replace', action='store_true',
+                        help='allow truncating the tables to load each scale')
+    parser.add_argument('--no-generate', dest='generate', action='store_false',
+                        help='benchmark the data already in the database')
+    parser.add_argument('--routes-only', action='store_true',
+                        help='time the list routes but not the report queries')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='slowdown counted as a regression (default 0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app()
+    # The per-request log line would drown the benchmark output
+    logging.getLogger('caregiver.requests').setLevel(logging.WARNING)
+
+    with engine.connect() as conn:
+        server_version = conn.execute(text("SHOW server_version")).scalar()
+    results = {
+        'commit': git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'server_version': server_version,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'scales': [],
+    }
+    try:
+        scales = [parse_scale(scale) for scale in args.scales.split(',')] if args.generate \
+            else [None]
+        for users in scales:
+            results['scales'].append(run_scale(users, args, app))
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Bulk import
+
+Loads CSV or NDJSON files into one table with PostgreSQL COPY. Rows are
+copied as text into a temporary staging table first, so a malformed value
+rejects its row instead of aborting the COPY. They are validated set-wise
+(required columns, values that do not parse as the column's type,
+duplicate keys, foreign keys) with one statement per check, and only the
+valid rows are inserted into the real table. Appointments are also
+checked against double-booking their caregiver. CSV files need a header
+row; NDJSON files take their column list from the first record.
+
+Type checks use pg_input_is_valid(), so PostgreSQL 16 or later is needed.
+
+Usage:
+    python bulk_import.py caregiver roster.csv
+    python bulk_import.py appointment appointments.ndjson --rejects rejected.csv
+"""
+
+from collections import namedtuple
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from database import engine
+
+# columns:      columns accepted in the input file
+# required:     columns that must be present and non-empty
+# keys:         column sets identifying a row; duplicates are rejected
+# foreign_keys: (column, parent table, parent column) checked against the parent
+# serial:       SERIAL column whose sequence must catch up with explicit ids
+# checks:       further (reason, condition on staging row s, repeat) rejections;
+#               repeat re-runs a check until it rejects nothing, for conditions
+#               that depend on which other staging rows are still valid
+ImportTable = namedtuple('ImportTable', ['columns', 'required', 'keys', 'foreign_keys',
+                                         'serial', 'checks'])
+
+APPOINTMENT_SLOT = "appointment_slot({0}.appointment_date, {0}.appointment_time, {0}.work_hours)"
+
+IMPORT_TABLES = {
+    'users': ImportTable(
+        columns=['user_id', 'email', 'given_name', 'surname', 'city', 'phone_number',
+                 'profile_description', 'password'],
+        required=['email', 'given_name', 'surname', 'password'],
+        keys=[['user_id'], ['email']],
+        foreign_keys=[],
+        serial='user_id',
+        checks=[],
+    ),
+    'caregiver': ImportTable(
+        columns=['caregiver_user_id', 'photo', 'gender', 'caregiving_type', 'hourly_rate'],
+        required=['caregiver_user_id', 'caregiving_type', 'hourly_rate'],
+        keys=[['caregiver_user_id']],
+        foreign_keys=[('caregiver_user_id', 'users', 'user_id')],
+        serial=None,
+        checks=[],
+    ),
+    'member': ImportTable(
+        columns=['member_user_id', 'house_rules', 'dependent_description'],
+        required=['member_user_id'],
+        keys=[['member_user_id']],
+        foreign_keys=[('member_user_id', 'users', 'user_id')],
+        serial=None,
+        checks=[],
+    ),
+    'address': ImportTable(
+        columns=['member_user_id', 'house_number', 'street', 'town'],
+        required=['member_user_id'],
+        keys=[['member_user_id']],
+        foreign_keys=[('member_user_id', 'member', 'member_user_id')],
+        serial=None,
+        checks=[],
+    ),
+    'job': ImportTable(
+        columns=['job_id', 'member_user_id', 'required_caregiving_type', 'other_requirements',
+                 'date_posted'],
+        required=['member_user_id', 'required_caregiving_type'],
+        keys=[['job_id']],
+        foreign_keys=[('member_user_id', 'member', 'member_user_id')],
+        serial='job_id',
+        checks=[],
+    ),
+    'job_application': ImportTable(
+        columns=['caregiver_user_id', 'job_id', 'date_applied'],
+        required=['caregiver_user_id', 'job_id'],
+        keys=[['caregiver_user_id', 'job_id']],
+        foreign_keys=[('caregiver_user_id', 'caregiver', 'caregiver_user_id'),
+                      ('job_id', 'job', 'job_id')],
+        serial=None,
+        checks=[],
+    ),
+    'appointment': ImportTable(
+        columns=['appointment_id', 'caregiver_user_id', 'member_user_id', 'appointment_date',
+                 'appointment_time', 'work_hours', 'status'],
+        required=['caregiver_user_id', 'member_user_id', 'appointment_date',
+                  'appointment_time', 'work_hours'],
+        keys=[['appointment_id']],
+        foreign_keys=[('caregiver_user_id', 'caregiver', 'caregiver_user_id'),
+                      ('member_user_id', 'member', 'member_user_id')],
+        serial='appointment_id',
+        checks=[
+            # appointment_no_overlap (migration 008); declined rows hold no slot
+            ('caregiver already booked', f"""
+                s.status IS DISTINCT FROM 'declined' AND EXISTS (
+                    SELECT 1 FROM appointment t
+                    WHERE t.caregiver_user_id = s.caregiver_user_id
+                      AND t.status IS DISTINCT FROM 'declined'
+                      AND {APPOINTMENT_SLOT.format('t')} && {APPOINTMENT_SLOT.format('s')}
+                )
+            """, False),
+            # The first row of a file wins a slot. An UPDATE sees the rows
+            # valid when it started, so each pass only rejects rows that
+            # overlap an earlier row nothing earlier overlaps (one that is
+            # certain to be kept); the next pass continues from there.
+            ('overlaps an earlier row in file', f"""
+                s.status IS DISTINCT FROM 'declined' AND EXISTS (
+                    SELECT 1 FROM import_staging o
+                    WHERE o.reject_reason IS NULL
+                      AND o.import_row < s.import_row
+                      AND o.caregiver_user_id = s.caregiver_user_id
+                      AND o.status IS DISTINCT FROM 'declined'
+                      AND {APPOINTMENT_SLOT.format('o')} && {APPOINTMENT_SLOT.format('s')}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM import_staging p
+                          WHERE p.reject_reason IS NULL
+                            AND p.import_row < o.import_row
+                            AND p.caregiver_user_id = o.caregiver_user_id
+                            AND p.status IS DISTINCT FROM 'declined'
+                            AND {APPOINTMENT_SLOT.format('p')} && {APPOINTMENT_SLOT.format('o')}
+                      )
+                )
+            """, True),
+        ],
+    ),
+}
+
+ImportReport = namedtuple('ImportReport', ['table', 'rows_read', 'rows_inserted', 'rejected',
+                                           'seconds'])
+
+
+class NdjsonCsvReader:
+    """File-like object that turns NDJSON lines into CSV for COPY FROM STDIN"""
+
+    def __init__(self, lines, columns):
+        self.lines = lines
+        self.columns = columns
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            self.writer.writerow(['' if record.get(c) is None else record[c] for c in self.columns])
+            self.pending += self.buffer.getvalue()
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        if size < 0:
+            size = len(self.pending)
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+
+def _chain(first, stream):
+    yield first
+    yield from stream
+
+
+def open_source(stream, fmt, spec):
+    """Return (columns, file-like CSV body without header) for a text stream"""
+    if fmt == 'csv':
+        header = next(csv.reader([stream.readline()]), [])
+        columns = [column.strip() for column in header]
+        source = stream
+    elif fmt == 'ndjson':
+        first = stream.readline()
+        while first and not first.strip():
+            first = stream.readline()
+        columns = list(json.loads(first)) if first else []
+        source = NdjsonCsvReader(_chain(first, stream), columns)
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+    unknown = [column for column in columns if column not in spec.columns]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    missing = [column for column in spec.required if column not in columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return columns, source
+
+
+def reject(cursor, reason, condition, staging='import_staging'):
+    """Mark every still-valid staging row matching condition as rejected, return how many"""
+    cursor.execute(
+        f"UPDATE {staging} s SET reject_reason = %(reason)s "
+        f"WHERE s.reject_reason IS NULL AND ({condition})",
+        {'reason': reason}
+    )
+    return cursor.rowcount
+
+
+def column_types(cursor, table, columns):
+    """Column name -> SQL type of table, e.g. {'hourly_rate': 'numeric(10,2)'}"""
+    cursor.execute("""
+        SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = CAST(%(table)s AS regclass) AND attname = ANY(%(columns)s)
+    """, {'table': table, 'columns': list(columns)})
+    return dict(cursor.fetchall())
+
+
+def validate_text(cursor, spec, columns, types):
+    """Checks on import_raw, the rows exactly as they were read"""
+    for column in spec.required:
+        reject(cursor, f'missing {column}', f's.{column} IS NULL', 'import_raw')
+    for column in columns:
+        reject(cursor, f'invalid {column}',
+               f"s.{column} IS NOT NULL AND NOT pg_input_is_valid(s.{column}, '{types[column]}')",
+               'import_raw')
+
+
+def validate(cursor, table, spec, columns):
+    """Run the set-wise checks over the typed staging table"""
+    for key in spec.keys:
+        if not all(column in columns for column in key):
+            continue
+        key_match = ' AND '.join(f't.{c} = s.{c}' for c in key)
+        reject(cursor, 'already exists',
+               f'EXISTS (SELECT 1 FROM {table} t WHERE {key_match})')
+        # A NULL key (e.g. a user_id left to the sequence) duplicates nothing
+        key_present = ' AND '.join(f'{c} IS NOT NULL' for c in key)
+        key_list = ', '.join(key)
+        reject(cursor, 'duplicate in file', f"""
+            {' AND '.join(f's.{c} IS NOT NULL' for c in key)}
+            AND s.import_row NOT IN (
+                SELECT min(import_row) FROM import_staging
+                WHERE reject_reason IS NULL AND {key_present}
+                GROUP BY {key_list}
+            )
+        """)
+
+    for column, parent, parent_column in spec.foreign_keys:
+        if column in columns:
+            reject(cursor, f'unknown {column}', f"""
+                NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.{parent_column} = s.{column})
+            """)
+
+    for reason, condition, repeat in spec.checks:
+        while reject(cursor, reason, condition) and repeat:
+            pass
+
+
+def import_stream(engine, table, stream, fmt='csv', rejects=None):
+    """
+    COPY a CSV/NDJSON text stream into table and return an ImportReport.
+
+    If rejects is a writable text stream, the rejected rows are written to
+    it as CSV together with the reason they were rejected.
+    """
+    if table not in IMPORT_TABLES:
+        raise ValueError(f'Unknown table: {table}')
+    spec = IMPORT_TABLES[table]
+    columns, source = open_source(stream, fmt, spec)
+    column_list = ', '.join(columns)
+
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        types = column_types(cursor, table, spec.columns)
+        # Text columns take any value, so COPY never fails on a malformed one
+        cursor.execute(f"""
+            CREATE TEMP TABLE import_raw (
+                import_row BIGSERIAL,
+                {', '.join(f'{column} TEXT' for column in columns)},
+                reject_reason TEXT
+            ) ON COMMIT DROP
+        """)
+        cursor.copy_expert(
+            f"COPY import_raw ({column_list}) FROM STDIN WITH (FORMAT csv)", source
+        )
+        cursor.execute("SELECT count(*) FROM import_raw")
+        rows_read = cursor.fetchone()[0]
+
+        validate_text(cursor, spec, columns, types)
+
+        # Every accepted column, so checks can name columns the file leaves out
+        cursor.execute(f"""
+            CREATE TEMP TABLE import_staging ON COMMIT DROP AS
+            SELECT {', '.join(spec.columns)} FROM {table} WITH NO DATA
+        """)
+        cursor.execute("""
+            ALTER TABLE import_staging
+                ADD COLUMN import_row BIGINT PRIMARY KEY,
+                ADD COLUMN reject_reason TEXT
+        """)
+        cursor.execute(f"""
+            INSERT INTO import_staging (import_row, {column_list})
+            SELECT import_row, {', '.join(f'CAST({c} AS {types[c]})' for c in columns)}
+            FROM import_raw
+            WHERE reject_reason IS NULL
+        """)
+
+        validate(cursor, table, spec, columns)
+
+        select_list = column_list
+        if spec.serial in columns:
+            sequence = f"pg_get_serial_sequence('{table}', '{spec.serial}')"
+            # Rows that leave the id empty take sequence values past every explicit id
+            cursor.execute(f"""
+                SELECT setval({sequence}, ids.last)
+                FROM (SELECT greatest((SELECT max({spec.serial}) FROM {table}),
+                                      (SELECT max({spec.serial}) FROM import_staging
+                                       WHERE reject_reason IS NULL)) AS last) ids
+                WHERE ids.last IS NOT NULL
+            """)
+            select_list = ', '.join(
+                f'COALESCE({c}, nextval({sequence}))' if c == spec.serial else c
+                for c in columns
+            )
+
+        cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {select_list} FROM import_staging
+            WHERE reject_reason IS NULL
+            ORDER BY import_row
+        """)
+        rows_inserted = cursor.rowcount
+
+        # Rejected at either stage, with the values as they were read
+        cursor.execute("""
+            UPDATE import_raw r SET reject_reason = s.reject_reason
+            FROM import_staging s
+            WHERE s.import_row = r.import_row AND s.reject_reason IS NOT NULL
+        """)
+        cursor.execute("""
+            SELECT reject_reason, count(*) FROM import_raw
+            WHERE reject_reason IS NOT NULL
+            GROUP BY reject_reason
+            ORDER BY count(*) DESC
+        """)
+        rejected = dict(cursor.fetchall())
+
+        if rejects is not None and rejected:
+            cursor.copy_expert(f"""
+                COPY (SELECT import_row, reject_reason, {column_list} FROM import_raw
+                      WHERE reject_reason IS NOT NULL ORDER BY import_row)
+                TO STDOUT WITH (FORMAT csv, HEADER true)
+            """, rejects)
+
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    return ImportReport(table, rows_read, rows_inserted, rejected,
+                        time.perf_counter() - started)
+
+
+def format_report(report):
+    """Human-readable one-paragraph summary of an ImportReport"""
+    rate = report.rows_read / report.seconds if report.seconds else 0
+    lines = [
+        f"Imported {report.rows_inserted} of {report.rows_read} row(s) into {report.table} "
+        f"in {report.seconds:.2f}s ({rate:,.0f} rows/sec)"
+    ]
+    for reason, count in report.rejected.items():
+        lines.append(f"  rejected {count}: {reason}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import CSV/NDJSON with COPY')
+    parser.add_argument('table', choices=sorted(IMPORT_TABLES))
+    parser.add_argument('path', help='input file (.csv or .ndjson)')
+    parser.add_argument('--format', choices=['csv', 'ndjson'],
+                        help='input format (default: from the file extension)')
+    parser.add_argument('--rejects', help='write rejected rows to this CSV file')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('ndjson' if args.path.endswith(('.ndjson', '.jsonl')) else 'csv')
+    rejects = open(args.rejects, 'w', newline='') if args.rejects else None
+    try:
+        with open(args.path, newline='') as stream:
+            report = import_stream(engine, args.table, stream, fmt, rejects)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return 1
+    finally:
+        if rejects is not None:
+            rejects.close()
+    print(f"✓ {format_report(report)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
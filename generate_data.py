@@ -0,0 +1,284 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Synthetic data generator
+
+Fills all seven tables with a reproducible synthetic data set so the
+queries can be tried at realistic sizes. Rows are generated inside
+PostgreSQL with generate_series() and a random() seeded by setseed(), so
+even 10M users load without streaming anything through Python, and the
+same scale and seed always produce the same data.
+
+The scale is the number of users; the other tables follow from it:
+
+    caregiver        45% of the users (babysitter / Elderly Care / playmate)
+    member           the other 55%
+    address          one per member, in the member's city
+    job              0.8 per member
+    job_application  skewed: most jobs get a few applicants, a few get dozens
+    appointment      one per user (accepted / declined / pending), less the
+                     few that would double-book a caregiver
+
+Usage:
+    python generate_data.py 100k
+    python generate_data.py 1m --seed 7 --replace
+"""
+
+from collections import namedtuple
+import argparse
+import random
+import sys
+import time
+
+from sqlalchemy import text
+
+from database import engine, is_materialized_view
+
+TABLES = ['users', 'caregiver', 'member', 'address', 'job', 'job_application', 'appointment']
+
+DEFAULT_SEED = 341
+
+GenerationReport = namedtuple('GenerationReport', ['users', 'seed', 'rows', 'seconds'])
+
+
+def parse_scale(value):
+    """Parse a user count such as 10000, 10k or 1.5M"""
+    value = str(value).strip().lower()
+    multiplier = 1
+    if value[-1:] in ('k', 'm'):
+        multiplier = 1000 if value[-1] == 'k' else 1000000
+        value = value[:-1]
+    users = int(float(value) * multiplier)
+    if users < 100:
+        raise ValueError('scale must be at least 100 users')
+    return users
+
+
+def format_scale(users):
+    """Inverse of parse_scale for labels: 10000 -> 10k"""
+    if users % 1000000 == 0:
+        return f'{users // 1000000}m'
+    if users % 1000 == 0:
+        return f'{users // 1000}k'
+    return str(users)
+
+
+def weighted(choices, r):
+    """SQL CASE mapping the uniform column r onto one of [(value, weight)]"""
+    total = sum(weight for _, weight in choices)
+    branches = []
+    upper = 0.0
+    for value, weight in choices[:-1]:
+        upper += weight / total
+        branches.append(f"WHEN {r} < {upper:.6f} THEN '{value}'")
+    return f"CASE {' '.join(branches)} ELSE '{choices[-1][0]}' END"
+
+
+def pick(values):
+    """SQL expression picking a uniformly random element of values"""
+    quoted = ', '.join("'" + value.replace("'", "''") + "'" for value in values)
+    return f"(ARRAY[{quoted}])[1 + floor(random() * {len(values)})::int]"
+
+
+GIVEN_NAMES = ['Arman', 'Amina', 'Aigerim', 'Dana', 'Nurlan', 'Timur', 'Aruzhan', 'Yerlan',
+               'Madina', 'Daniyar', 'Saule', 'Askar', 'Kamila', 'Bauyrzhan', 'Zarina', 'Alibek']
+SURNAMES = ['Armanov', 'Aminova', 'Sadykov', 'Nurlanova', 'Tokayev', 'Zhumabekova',
+            'Omarov', 'Akhmetova', 'Seitkali', 'Bekova', 'Iskakov', 'Kassymova']
+CITIES = [('Astana', 35), ('Almaty', 35), ('Shymkent', 12), ('Karaganda', 8),
+          ('Aktobe', 5), ('Pavlodar', 5)]
+CAREGIVING_TYPES = [('babysitter', 45), ('Elderly Care', 35), ('playmate', 20)]
+STATUSES = [('accepted', 55), ('pending', 25), ('declined', 20)]
+GENDERS = [('Female', 70), ('Male', 30)]
+PROFILES = ['Friendly and reliable.', 'Looking for trusted help at home.',
+            'Experienced with children and seniors.', 'Works weekends only.',
+            'Patient, calm and punctual.', 'New to the platform.']
+HOUSE_RULES = ['No pets.', 'No smoking.', 'No pets. No smoking.', 'Shoes off inside.',
+               'Quiet hours after 9pm.', 'Please be punctual.', 'Vegetarian kitchen.',
+               'No pets. Shoes off inside.', 'No visitors.', 'Wash hands on arrival.']
+DEPENDENTS = ['5-year-old son who likes reading', 'Twin girls aged 3',
+              '80-year-old grandmother with limited mobility', 'Father recovering from surgery',
+              '8-year-old daughter, loves drawing', 'Elderly parent who needs company']
+REQUIREMENTS = ['Must be soft-spoken and patient', 'Experience with toddlers',
+                'First aid certificate required', 'Must speak Kazakh and Russian',
+                'Non-smoker, punctual', 'Able to cook simple meals', 'Driving licence preferred',
+                'Available on weekends', 'Gentle and soft-spoken with seniors',
+                'Help with homework', 'Medication reminders', 'Light housekeeping']
+STREETS = ['Kabanbay Batyr', 'Abay', 'Dostyk', 'Turan', 'Mangilik El', 'Respublika',
+           'Kenesary', 'Satpayev', 'Tole Bi', 'Zhibek Zholy', 'Al-Farabi', 'Baitursynov',
+           'Kunayev', 'Seifullin', 'Auezov', 'Gogol', 'Pushkin', 'Bogenbay Batyr',
+           'Syganak', 'Kerey Zhanibek', 'Ualikhanov', 'Tauelsizdik', 'Saryarka',
+           'Zhenis', 'Beibitshilik', 'Imanov', 'Abylai Khan', 'Kazybek Bi', 'Nazarbayev',
+           'Zheltoksan']
+
+# One INSERT per table, all ids follow from the users sequence after TRUNCATE ...
+# RESTART IDENTITY: caregivers are users 1..:caregivers, members the rest.
+GENERATE_SQL = {
+    'users': f"""
+        INSERT INTO users (email, given_name, surname, city, phone_number,
+                           profile_description, password)
+        SELECT lower(given_name) || '.' || g || '@example.kz', given_name, surname,
+               {weighted(CITIES, 'r_city')},
+               '+77' || lpad((g % 1000000000)::text, 9, '0'), profile, md5(g::text)
+        FROM (
+            SELECT g, {pick(GIVEN_NAMES)} AS given_name, {pick(SURNAMES)} AS surname,
+                   random() AS r_city, {pick(PROFILES)} AS profile
+            FROM generate_series(1, :users) g
+        ) s
+        ORDER BY g
+    """,
+    'caregiver': f"""
+        INSERT INTO caregiver (caregiver_user_id, photo, gender, caregiving_type, hourly_rate)
+        SELECT g,
+               CASE WHEN r_photo < 0.6 THEN 'photos/caregiver_' || g || '.jpg' END,
+               {weighted(GENDERS, 'r_gender')},
+               {weighted(CAREGIVING_TYPES, 'r_type')},
+               -- right-skewed rates: most caregivers charge 6-12, a few up to 40
+               round((6 + 34 * r_rate ^ 3)::numeric, 2)
+        FROM (
+            SELECT g, random() AS r_photo, random() AS r_gender, random() AS r_type,
+                   random() AS r_rate
+            FROM generate_series(1, :caregivers) g
+        ) s
+        ORDER BY g
+    """,
+    'member': f"""
+        INSERT INTO member (member_user_id, house_rules, dependent_description)
+        SELECT g, {pick(HOUSE_RULES)}, {pick(DEPENDENTS)}
+        FROM generate_series(:caregivers + 1, :users) g
+    """,
+    'address': f"""
+        INSERT INTO address (member_user_id, house_number, street, town)
+        SELECT u.user_id, (1 + floor(random() * 200))::int::text, {pick(STREETS)}, u.city
+        FROM users u
+        WHERE u.user_id > :caregivers
+        ORDER BY u.user_id
+    """,
+    'job': f"""
+        INSERT INTO job (member_user_id, required_caregiving_type, other_requirements,
+                         date_posted)
+        SELECT member_user_id, {weighted(CAREGIVING_TYPES, 'r_type')}, requirements, date_posted
+        FROM (
+            SELECT g, :caregivers + 1 + floor(random() * (:users - :caregivers))::int
+                          AS member_user_id,
+                   random() AS r_type, {pick(REQUIREMENTS)} AS requirements,
+                   DATE '2025-01-01' + floor(random() * 365)::int AS date_posted
+            FROM generate_series(1, :jobs) g
+        ) s
+        ORDER BY g
+    """,
+    'job_application': """
+        INSERT INTO job_application (caregiver_user_id, job_id, date_applied)
+        SELECT 1 + floor(random() * :caregivers)::int, j.job_id,
+               j.date_posted + floor(random() * 30)::int
+        FROM (
+            -- random()^4 gives a long tail: ~40% of jobs get no applicant, a few get 40
+            SELECT job_id, date_posted, floor(41 * random() ^ 4)::int AS applicants
+            FROM job
+            ORDER BY job_id
+        ) j
+        CROSS JOIN LATERAL generate_series(1, j.applicants)
+        ON CONFLICT DO NOTHING
+    """,
+    'appointment': f"""
+        INSERT INTO appointment (caregiver_user_id, member_user_id, appointment_date,
+                                 appointment_time, work_hours, status)
+        SELECT caregiver_user_id, member_user_id, appointment_date, appointment_time,
+               work_hours, {weighted(STATUSES, 'r_status')}
+        FROM (
+            SELECT g, 1 + floor(random() * :caregivers)::int AS caregiver_user_id,
+                   :caregivers + 1 + floor(random() * (:users - :caregivers))::int
+                       AS member_user_id,
+                   DATE '2024-06-01' + floor(random() * 540)::int AS appointment_date,
+                   TIME '07:00' + floor(random() * 27)::int * INTERVAL '30 minutes'
+                       AS appointment_time,
+                   1 + floor(random() ^ 2 * 8)::int AS work_hours,
+                   random() AS r_status
+            FROM generate_series(1, :users) g
+        ) s
+        ORDER BY g
+        -- Skips rows the appointment_no_overlap constraint rejects
+        ON CONFLICT DO NOTHING
+    """,
+}
+
+# Named rows that the update/delete queries of main.py look for
+FIXTURES = [
+    "UPDATE users SET given_name = 'Arman', surname = 'Armanov' WHERE user_id = 1",
+    "UPDATE users SET given_name = 'Amina', surname = 'Aminova' WHERE user_id = :caregivers + 1",
+]
+
+
+def table_seed(seed, table):
+    """setseed() argument for one table, so each table is reproducible on its own"""
+    return random.Random(f'{seed}:{table}').uniform(-1, 1)
+
+
+def row_counts(conn):
+    return {table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in TABLES}
+
+
+def generate(engine, users, seed=DEFAULT_SEED, replace=False, progress=None):
+    """
+    Load a synthetic data set of the given number of users and return a
+    GenerationReport. Existing rows are only truncated when replace is set.
+    """
+    params = {
+        'users': users,
+        'caregivers': int(users * 0.45),
+        'jobs': int((users - int(users * 0.45)) * 0.8),
+    }
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL synchronous_commit = off"))
+        if any(row_counts(conn).values()):
+            if not replace:
+                raise ValueError('tables are not empty, pass replace=True (--replace) '
+                                 'to truncate them first')
+            conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+
+        for table in TABLES:
+            table_started = time.perf_counter()
+            conn.execute(text("SELECT setseed(:seed)"), {'seed': table_seed(seed, table)})
+            result = conn.execute(text(GENERATE_SQL[table]), params)
+            if progress:
+                progress(table, result.rowcount, time.perf_counter() - table_started)
+        for fixture in FIXTURES:
+            conn.execute(text(fixture), params)
+
+        if is_materialized_view(conn, 'job_applications_view'):
+            conn.execute(text("REFRESH MATERIALIZED VIEW job_applications_view"))
+        rows = row_counts(conn)
+
+    # Fresh statistics, otherwise the planner keeps estimating the old table sizes;
+    # plain ANALYZE also covers the summary tables and materialized views
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    return GenerationReport(users, seed, rows, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic data set')
+    parser.add_argument('scale', help='number of users, e.g. 10000, 10k, 1m')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'random seed (default {DEFAULT_SEED})')
+    parser.add_argument('--replace', action='store_true',
+                        help='truncate the seven tables before loading')
+    args = parser.parse_args(argv)
+
+    def progress(table, rows, seconds):
+        print(f"  {table:<16} {rows:>12,} rows  {seconds:8.2f}s")
+
+    try:
+        users = parse_scale(args.scale)
+        print(f"Generating {users:,} users (seed {args.seed})...")
+        report = generate(engine, users, args.seed, args.replace, progress)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return 1
+    print(f"✓ Generated {sum(report.rows.values()):,} rows in {report.seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
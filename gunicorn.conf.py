@@ -0,0 +1,32 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Gunicorn configuration
+
+Loaded by the Procfile (gunicorn -c gunicorn.conf.py 'app:create_app()').
+Workers (WEB_CONCURRENCY) and the bind address (PORT) use gunicorn's own
+environment defaults.
+
+    GUNICORN_PRELOAD      import the app once in the master and fork the
+                          workers from it, "0" to import it in every
+                          worker instead (default on)
+    DB_WARM_CONNECTIONS   pooled connections each worker opens before
+                          /ready reports it warm (default 2)
+
+startup_benchmark.py compares the two modes.
+"""
+
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() not in ('0', 'false', 'no')
+
+
+def post_fork(server, worker):
+    # Only a preloaded app has engines that were created in the master
+    if server.cfg.preload_app:
+        import app
+        app.after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    import app
+    app.start_warm_up(worker.wsgi)
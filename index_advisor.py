@@ -0,0 +1,511 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Index advisor
+
+Collects the SQL statements used by main.py, app.py and purge.py, runs
+EXPLAIN (FORMAT JSON) for each of them against a populated database, looks
+for sequential scans and hash joins over large relations, and proposes
+partial, composite or covering indexes. The proposed indexes are built
+inside a transaction that is rolled back afterwards (or created as
+hypothetical indexes when the hypopg extension is installed), so the
+estimated cost of every statement can be reported before and after.
+
+Statements are collected in two ways:
+  - without parameters: the statements registered by app.py, queries.py
+    and reports.py (see statements.py), the SQL string literals in main.py
+    and the batch selects of the section 4 purges (bind parameters are
+    planned with EXPLAIN (GENERIC_PLAN), which needs PostgreSQL 16 or newer)
+  - the statements app.py actually runs when its read-only pages and
+    lookup endpoints are requested, with their real parameters
+
+Usage:
+    python index_advisor.py                  # report + migration on stdout
+    python index_advisor.py --write          # also write migrations/NNN_advised_indexes.sql
+    python index_advisor.py --min-rows 1000  # treat smaller tables as large
+"""
+
+from collections import namedtuple
+from pathlib import Path
+from sqlalchemy import event, text
+import argparse
+import ast
+import importlib
+import json
+import re
+import sys
+
+from database import engine
+import purge
+import statements as registry
+
+BASE_DIR = Path(__file__).resolve().parent
+# Run their statements from inside main(), so they are only registered then
+SOURCE_FILES = ['main.py']
+
+# Relations with fewer estimated rows are not worth an index
+DEFAULT_MIN_ROWS = 10000
+# Columns with at most this many distinct values become partial-index predicates
+LOW_CARDINALITY = 20
+# Covering indexes INCLUDE at most this many extra columns
+MAX_INCLUDE = 4
+
+# A keyword followed by more SQL, so a bare 'DELETE' compared against is no statement
+SQL_START = re.compile(r'\s*(SELECT|WITH|UPDATE|DELETE)\s+\S', re.IGNORECASE)
+BIND_PARAM = re.compile(r'(?<![:\w]):(\w+)')
+JOIN_CONDITIONS = ('Hash Cond', 'Merge Cond', 'Join Filter', 'Index Cond')
+SYSTEM_COLUMNS = {'ctid', 'xmin', 'xmax', 'cmin', 'cmax', 'tableoid'}
+
+Statement = namedtuple('Statement', ['source', 'sql', 'params'])
+Candidate = namedtuple('Candidate', ['table', 'columns', 'include', 'where', 'method', 'reason'])
+
+
+# ============================================================
+# STATEMENT COLLECTION
+# ============================================================
+
+def normalize(sql):
+    return ' '.join(sql.split())
+
+
+def collect_registered():
+    """The statements app.py, queries.py and reports.py register when imported"""
+    # Importing app registers its statements and the list queries
+    importlib.import_module('app')
+    from reports import REPORT_STATEMENTS
+
+    reports = {registered.name: key for key, registered in REPORT_STATEMENTS.items()}
+    collected = []
+    for registered in list(registry.STATEMENTS.values()):
+        if not registered.preparable or not SQL_START.match(registered.sql):
+            continue
+        if registered.name in reports:
+            collected.append(Statement(f'report {reports[registered.name]}',
+                                       registered.sql, None))
+            continue
+        # List queries are fragments completed at runtime (pagination,
+        # lookups); those are collected by collect_runtime()
+        if registered.sql.lstrip()[:6].upper() == 'SELECT' \
+                and not re.search(r'\bWHERE\b', registered.sql, re.IGNORECASE):
+            continue
+        collected.append(Statement(f'statement {registered.name}', registered.sql, None))
+    return collected
+
+
+def collect_literals():
+    """SQL string literals in SOURCE_FILES"""
+    statements = []
+    for name in SOURCE_FILES:
+        path = BASE_DIR / name
+        tree = ast.parse(path.read_text(), filename=name)
+        docstrings = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Expr)}
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+                continue
+            if id(node) in docstrings:
+                continue
+            sql = node.value
+            if not SQL_START.match(sql) or '{' in sql:
+                continue
+            statements.append(Statement(f'{name}:{node.lineno}', sql, None))
+    return statements
+
+
+def collect_purges():
+    """The batch selects of the section 4 purges; their deletes are registered by app.py"""
+    return [Statement(f'purge {key}', purge.batch_query(target, predicate), None)
+            for key, (target, predicate) in purge.PRESETS.items()]
+
+
+def collect_static():
+    """Statements known without running the app, planned with generic parameters"""
+    return collect_registered() + collect_literals() + collect_purges()
+
+
+def sample_paths(conn):
+    """Read-only app.py URLs to replay, with ids taken from the database"""
+    paths = [
+        '/users', '/caregivers', '/members', '/addresses', '/jobs',
+        '/job_applications', '/job_applications?live=1', '/appointments',
+        '/api/lookup/users?q=ar', '/api/lookup/users?q=arm',
+        '/api/lookup/caregivers?q=arm', '/api/lookup/members?q=arm',
+        '/api/lookup/jobs?q=arm',
+    ]
+    ids = conn.execute(text("""
+        SELECT (SELECT min(user_id) FROM users),
+               (SELECT min(caregiver_user_id) FROM caregiver),
+               (SELECT min(member_user_id) FROM member),
+               (SELECT min(member_user_id) FROM address),
+               (SELECT min(job_id) FROM job),
+               (SELECT min(appointment_id) FROM appointment)
+    """)).fetchone()
+    templates = ['/users/{}/update', '/caregivers/{}/update', '/members/{}/update',
+                 '/addresses/{}/update', '/jobs/{}/update', '/appointments/{}/update']
+    paths += [t.format(i) for t, i in zip(templates, ids) if i is not None]
+    return paths
+
+
+def collect_runtime():
+    """Statements app.py runs for its read-only pages, captured from its engines"""
+    from app import create_app
+    app = create_app()
+    # The app's own pools: reads may go to its replica
+    app_engines = app.extensions['caregiver'].engines()
+
+    captured = []
+    current = {'source': None}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current['source'] and statement.lstrip()[:6].upper() == 'SELECT':
+            captured.append(Statement(current['source'], statement, parameters))
+
+    with engine.connect() as conn:
+        paths = sample_paths(conn)
+
+    for app_engine in app_engines:
+        event.listen(app_engine, 'before_cursor_execute', capture)
+    try:
+        client = app.test_client()
+        for path in paths:
+            current['source'] = f'GET {path}'
+            response = client.get(path)
+            # Follow the first "next page" link so seek queries are covered too
+            match = re.search(r'[?&]after=([^"&]+)', response.get_data(as_text=True))
+            if match:
+                separator = '&' if '?' in path else '?'
+                current['source'] = f'GET {path} (next page)'
+                client.get(f'{path}{separator}after={match.group(1)}')
+    finally:
+        current['source'] = None
+        for app_engine in app_engines:
+            event.remove(app_engine, 'before_cursor_execute', capture)
+            app_engine.dispose()
+    return captured
+
+
+def collect_statements():
+    statements, seen = [], set()
+    for statement in collect_static() + collect_runtime():
+        key = normalize(statement.sql)
+        if key not in seen:
+            seen.add(key)
+            statements.append(statement)
+    return statements
+
+
+# ============================================================
+# EXPLAIN
+# ============================================================
+
+def to_positional(sql):
+    """Rewrite :name bind parameters as $1..$n for EXPLAIN (GENERIC_PLAN)"""
+    numbers = {}
+
+    def replace(match):
+        numbers.setdefault(match.group(1), len(numbers) + 1)
+        return f'${numbers[match.group(1)]}'
+
+    return BIND_PARAM.sub(replace, sql), len(numbers)
+
+
+def explain(cursor, statement, generic_plans):
+    """Return the JSON plan of a statement, or None if it cannot be planned"""
+    if statement.params is None:
+        sql, count = to_positional(statement.sql)
+        if count and not generic_plans:
+            return None
+        options = 'FORMAT JSON, VERBOSE' + (', GENERIC_PLAN' if count else '')
+        args = None
+    else:
+        sql, options, args = statement.sql, 'FORMAT JSON, VERBOSE', statement.params
+
+    cursor.execute("SAVEPOINT advisor_explain")
+    try:
+        cursor.execute(f"EXPLAIN ({options}) {sql}", args)
+        plan = cursor.fetchone()[0]
+        cursor.execute("RELEASE SAVEPOINT advisor_explain")
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT advisor_explain")
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def walk(node, ancestors=()):
+    yield node, ancestors
+    for child in node.get('Plans', []):
+        yield from walk(child, ancestors + (node,))
+
+
+def index_names(plan):
+    return {node['Index Name'] for node, _ in walk(plan) if 'Index Name' in node}
+
+
+# ============================================================
+# ANALYSIS
+# ============================================================
+
+def existing_indexes(cursor):
+    """Set of (table, leading column tuple) for every plain index in the schema"""
+    cursor.execute("""
+        SELECT t.relname, array_agg(a.attname ORDER BY k.ord)
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+        WHERE t.relnamespace = 'public'::regnamespace AND i.indpred IS NULL
+        GROUP BY i.indexrelid, t.relname
+    """)
+    return {(table, tuple(columns)) for table, columns in cursor.fetchall()}
+
+
+def already_indexed(candidate, existing):
+    """True if an existing index starts with the candidate's key columns"""
+    if candidate.method != 'btree' or candidate.where or candidate.include:
+        return False
+    return any(table == candidate.table and columns[:len(candidate.columns)] == candidate.columns
+               for table, columns in existing)
+
+
+def table_stats(cursor):
+    """Estimated rows per relation and distinct values per column"""
+    cursor.execute("""
+        SELECT c.relname, c.reltuples
+        FROM pg_class c
+        WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'm')
+    """)
+    rows = {name: max(tuples, 0) for name, tuples in cursor.fetchall()}
+    cursor.execute("SELECT tablename, attname, n_distinct FROM pg_stats WHERE schemaname = 'public'")
+    distinct = {}
+    for table, column, n_distinct in cursor.fetchall():
+        distinct[(table, column)] = n_distinct if n_distinct >= 0 else -n_distinct * rows.get(table, 0)
+    return rows, distinct
+
+
+def alias_columns(expression, alias):
+    columns = re.findall(rf'\b{re.escape(alias)}\.(\w+)', expression or '')
+    return [c for c in dict.fromkeys(columns) if c not in SYSTEM_COLUMNS]
+
+
+def analyse(statement, plan, stats, min_rows):
+    """Return (findings, candidates) for one plan"""
+    rows, distinct = stats
+    findings, candidates = [], []
+    for node, ancestors in walk(plan):
+        node_type = node['Node Type']
+        if node_type == 'Hash Join':
+            large = [n['Relation Name'] for n, _ in walk(node)
+                     if n['Node Type'] == 'Seq Scan' and rows.get(n.get('Relation Name'), 0) >= min_rows]
+            if large:
+                findings.append(f"hash join over {', '.join(sorted(set(large)))}")
+        if node_type != 'Seq Scan':
+            continue
+
+        table = node['Relation Name']
+        alias = node.get('Alias', table)
+        if rows.get(table, 0) < min_rows:
+            continue
+        condition = node.get('Filter', '')
+        findings.append(f"seq scan on {table} ({rows[table]:,.0f} rows)"
+                        + (f" filter {condition}" if condition else ''))
+
+        qualified = rf'\(*{re.escape(alias)}\.(\w+)\)*(?:::[\w ]+)?'
+        equalities = re.findall(qualified + r"\s*=\s*('(?:[^']|'')*')", condition)
+        likes = re.findall(qualified + r"\s*~~\*?\s*'%", condition)
+        join_columns = []
+        for ancestor in reversed(ancestors):
+            for key in JOIN_CONDITIONS:
+                join_columns += alias_columns(ancestor.get(key), alias)
+            if ancestor['Node Type'] in ('Hash Join', 'Merge Join', 'Nested Loop'):
+                break
+
+        columns, predicates = [], []
+        for column, literal in equalities:
+            if 0 < distinct.get((table, column), LOW_CARDINALITY + 1) <= LOW_CARDINALITY:
+                predicates.append(f'{column} = {literal}')
+            elif column not in columns:
+                columns.append(column)
+        columns += [c for c in join_columns if c not in columns]
+        if predicates and not columns:
+            columns = [predicates[0].split(' = ')[0]]
+
+        for column in likes:
+            candidates.append(Candidate(table, (column,), (), None, 'gin_trgm',
+                                        f'{statement.source}: LIKE with leading wildcard'))
+        if not columns:
+            continue
+
+        # A Seq Scan emits every column, so the columns actually needed are
+        # the ones its parent reads
+        predicate_columns = {p.split(' = ')[0] for p in predicates}
+        consumer = ancestors[-1] if ancestors else node
+        needed = alias_columns(' '.join(consumer.get('Output', [])), alias)
+        include = [c for c in needed if c not in columns and c not in predicate_columns]
+        if len(include) > MAX_INCLUDE:
+            include = []
+        candidates.append(Candidate(
+            table, tuple(columns), tuple(include),
+            ' AND '.join(predicates) or None, 'btree',
+            f'{statement.source}: seq scan on {table}'
+        ))
+    return findings, candidates
+
+
+def candidate_name(candidate):
+    parts = [candidate.table, *candidate.columns]
+    if candidate.include:
+        parts.append('covering')
+    if candidate.where:
+        parts.append('partial')
+    parts.append('trgm_idx' if candidate.method == 'gin_trgm' else 'idx')
+    return '_'.join(parts)[:63]
+
+
+def candidate_sql(candidate):
+    name = candidate_name(candidate)
+    if candidate.method == 'gin_trgm':
+        return (f"CREATE INDEX IF NOT EXISTS {name}\n"
+                f"    ON {candidate.table} USING gin ({candidate.columns[0]} gin_trgm_ops);")
+    sql = f"CREATE INDEX IF NOT EXISTS {name}\n    ON {candidate.table} ({', '.join(candidate.columns)})"
+    if candidate.include:
+        sql += f"\n    INCLUDE ({', '.join(candidate.include)})"
+    if candidate.where:
+        sql += f"\n    WHERE {candidate.where}"
+    return sql + ';'
+
+
+def build_candidates(cursor, candidates, hypothetical):
+    """Create every candidate (hypothetically or for real) and map plan index names to it"""
+    names = {}
+    for candidate in candidates:
+        sql = candidate_sql(candidate).replace('IF NOT EXISTS ', '')
+        cursor.execute("SAVEPOINT advisor_index")
+        try:
+            if hypothetical:
+                cursor.execute("SELECT indexname FROM hypopg_create_index(%s)", (sql,))
+                names[cursor.fetchone()[0]] = candidate
+            else:
+                cursor.execute(sql)
+                names[candidate_name(candidate)] = candidate
+            cursor.execute("RELEASE SAVEPOINT advisor_index")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT advisor_index")
+            print(f"  ✗ could not build {candidate_name(candidate)}: {e}".rstrip(), file=sys.stderr)
+    return names
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def advise(min_rows=DEFAULT_MIN_ROWS):
+    """Return (report lines, migration SQL or None)"""
+    statements = collect_statements()
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SHOW server_version_num")
+        generic_plans = int(cursor.fetchone()[0]) >= 160000
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'hypopg'")
+        hypothetical = cursor.fetchone() is not None
+        stats = table_stats(cursor)
+        existing = existing_indexes(cursor)
+
+        # Plans and findings are keyed by position in statements
+        before, skipped, findings, candidates = {}, [], {}, {}
+        for i, statement in enumerate(statements):
+            plan = explain(cursor, statement, generic_plans)
+            if plan is None:
+                skipped.append(statement.source)
+                continue
+            before[i] = plan
+            found, proposed = analyse(statement, plan, stats, min_rows)
+            findings[i] = found
+            for candidate in proposed:
+                if already_indexed(candidate, existing):
+                    continue
+                # One index per key and predicate; covering columns are merged
+                key = (candidate.table, candidate.columns, candidate.where, candidate.method)
+                if key in candidates:
+                    merged = candidates[key]
+                    include = tuple(dict.fromkeys(merged.include + candidate.include))
+                    candidates[key] = merged._replace(
+                        include=include if len(include) <= MAX_INCLUDE else merged.include,
+                        reason=merged.reason + '; ' + candidate.reason,
+                    )
+                else:
+                    candidates[key] = candidate
+
+        names = build_candidates(cursor, list(candidates.values()), hypothetical)
+        after, used = {}, {}
+        for i in before:
+            plan = explain(cursor, statements[i], generic_plans)
+            if plan is None:
+                continue
+            after[i] = plan
+            if plan['Total Cost'] >= before[i]['Total Cost']:
+                continue
+            for name in index_names(plan) & set(names):
+                used.setdefault(candidate_sql(names[name]), []).append(i)
+    finally:
+        # Never keep the trial indexes
+        raw.rollback()
+        raw.close()
+
+    lines = [f"Analysed {len(before)} statement(s)"
+             + (f", skipped {len(skipped)} that could not be planned" if skipped else '')
+             + (" using hypothetical indexes (hypopg)" if hypothetical else '')]
+    for i, plan in before.items():
+        cost_before = plan['Total Cost']
+        cost_after = after.get(i, plan)['Total Cost']
+        lines.append(f"\n{statements[i].source}")
+        lines.append(f"  estimated cost {cost_before:,.2f} -> {cost_after:,.2f}")
+        for finding in findings[i]:
+            lines.append(f"  - {finding}")
+
+    if not used:
+        lines.append("\nNo index recommendations.")
+        return lines, None
+
+    migration = [
+        "-- Indexes recommended by index_advisor.py for the statements in",
+        "-- main.py and app.py. Estimated total cost before -> after for each",
+        "-- statement that uses the index.",
+        "",
+    ]
+    for sql, users in used.items():
+        for i in users:
+            migration.append(f"-- {statements[i].source}: {before[i]['Total Cost']:,.2f} -> "
+                             f"{after[i]['Total Cost']:,.2f}")
+        migration.append(sql)
+        migration.append('')
+    return lines, '\n'.join(migration)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recommend indexes for the app queries')
+    parser.add_argument('--min-rows', type=float, default=DEFAULT_MIN_ROWS,
+                        help=f'smallest relation worth indexing (default {DEFAULT_MIN_ROWS})')
+    parser.add_argument('--write', action='store_true',
+                        help='write the recommendations as the next file in migrations/')
+    args = parser.parse_args(argv)
+
+    lines, migration = advise(args.min_rows)
+    print('\n'.join(lines))
+    if migration is None:
+        return 0
+
+    if args.write:
+        existing = [int(p.name.split('_')[0]) for p in (BASE_DIR / 'migrations').glob('[0-9]*.sql')]
+        number = max(existing, default=0) + 1
+        path = BASE_DIR / 'migrations' / f'{number:03d}_advised_indexes.sql'
+        path.write_text(migration)
+        print(f"\n✓ Wrote {path.relative_to(BASE_DIR)}")
+    else:
+        print('\n' + migration)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
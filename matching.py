@@ -0,0 +1,165 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Caregiver matching
+
+An in-memory index of caregivers grouped by (caregiving type, city), each
+group kept sorted by hourly rate (cheapest first) and then by accepted
+appointments (most first). Matching a job is a dictionary lookup and a
+slice instead of a join over caregiver, users and caregiver_earnings.
+
+The index is built with one query and then kept current per caregiver:
+the web app calls refresh() with the caregivers it has just written,
+including those whose appointments it created, changed or deleted, also
+by deleting a user or member. A refresh that lands while a build is
+loading is applied again to the new groups, so the build's older
+snapshot cannot undo it. Writes made elsewhere (other workers, main.py,
+purge.py, bulk imports) are picked up when the index reaches its maximum
+age and is rebuilt.
+"""
+
+from bisect import bisect_left, insort
+from collections import namedtuple
+import threading
+import time
+
+from statements import statement
+
+Candidate = namedtuple('Candidate', ['caregiver_user_id', 'given_name', 'surname', 'email',
+                                     'city', 'caregiving_type', 'hourly_rate',
+                                     'accepted_appointments'])
+
+CANDIDATE_SQL = """
+    SELECT c.caregiver_user_id, u.given_name, u.surname, u.email, u.city,
+           c.caregiving_type, c.hourly_rate,
+           COALESCE(e.accepted_appointments, 0) AS accepted_appointments
+    FROM caregiver c
+    JOIN users u ON u.user_id = c.caregiver_user_id
+    LEFT JOIN caregiver_earnings e ON e.caregiver_user_id = c.caregiver_user_id
+"""
+CANDIDATES = statement('match_candidates', CANDIDATE_SQL)
+CANDIDATES_BY_ID = statement('match_candidates_by_id',
+                             CANDIDATE_SQL + " WHERE c.caregiver_user_id = ANY(:ids)")
+
+
+def group_key(caregiving_type, city):
+    return (caregiving_type or '').strip().lower(), (city or '').strip().lower()
+
+
+def sort_key(candidate):
+    return (candidate.hourly_rate, -candidate.accepted_appointments,
+            candidate.caregiver_user_id)
+
+
+class MatchIndex:
+    """Thread-safe caregiver index; see the module docstring"""
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.groups = {}      # group key -> sorted [(sort key, Candidate)]
+        self.entries = {}     # caregiver_user_id -> (group key, sort key)
+        self.built_at = None
+        self.build_seconds = None
+        self.refreshes = 0
+        self.building = 0     # builds loading at the moment
+        self.pending = []     # (ids, candidates) of refreshes made while one was
+
+    def _add(self, candidate):
+        key = group_key(candidate.caregiving_type, candidate.city)
+        order = sort_key(candidate)
+        insort(self.groups.setdefault(key, []), (order, candidate))
+        self.entries[candidate.caregiver_user_id] = (key, order)
+
+    def _remove(self, caregiver_user_id):
+        key, order = self.entries.pop(caregiver_user_id)
+        group = self.groups[key]
+        del group[bisect_left(group, (order,))]
+        if not group:
+            del self.groups[key]
+
+    def _apply(self, ids, candidates):
+        for caregiver_user_id in ids:
+            if caregiver_user_id in self.entries:
+                self._remove(caregiver_user_id)
+        for candidate in candidates:
+            self._add(candidate)
+
+    def _end_build(self):
+        self.building -= 1
+        if not self.building:
+            self.pending = []
+
+    def build(self, session):
+        """Load every caregiver; readers keep the old index until it is swapped in"""
+        started = time.perf_counter()
+        with self.lock:
+            self.building += 1
+        try:
+            candidates = [Candidate(*row) for row in session.execute(CANDIDATES.clause)]
+        except Exception:
+            with self.lock:
+                self._end_build()
+            raise
+        groups = {}
+        entries = {}
+        for candidate in candidates:
+            key = group_key(candidate.caregiving_type, candidate.city)
+            order = sort_key(candidate)
+            groups.setdefault(key, []).append((order, candidate))
+            entries[candidate.caregiver_user_id] = (key, order)
+        for group in groups.values():
+            group.sort()
+        with self.lock:
+            self.groups, self.entries = groups, entries
+            # The snapshot above may predate them
+            for ids, refreshed in self.pending:
+                self._apply(ids, refreshed)
+            self._end_build()
+            self.built_at = time.monotonic()
+            self.build_seconds = time.perf_counter() - started
+
+    def refresh(self, session, caregiver_user_ids):
+        """Re-read the given caregivers; ids that no longer exist are dropped"""
+        ids = list(caregiver_user_ids)
+        if not ids:
+            return
+        with self.lock:
+            if self.built_at is None and not self.building:
+                # The next match builds from scratch
+                return
+        rows = session.execute(CANDIDATES_BY_ID.clause, {'ids': ids})
+        candidates = [Candidate(*row) for row in rows]
+        with self.lock:
+            self._apply(ids, candidates)
+            if self.building:
+                self.pending.append((ids, candidates))
+            self.refreshes += 1
+
+    def invalidate(self):
+        """Rebuild on the next match, e.g. after a bulk load"""
+        with self.lock:
+            self.built_at = None
+
+    def matches(self, session, caregiving_type, city, limit):
+        """Best candidates of one type in one city, building the index if needed"""
+        with self.lock:
+            stale = self.built_at is None or (
+                self.max_age and time.monotonic() - self.built_at > self.max_age
+            )
+        if stale:
+            self.build(session)
+        with self.lock:
+            group = self.groups.get(group_key(caregiving_type, city), [])
+            return len(group), [candidate for _, candidate in group[:limit]]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'caregivers': len(self.entries),
+                'groups': len(self.groups),
+                'age_s': round(time.monotonic() - self.built_at, 3)
+                    if self.built_at is not None else None,
+                'build_ms': round(self.build_seconds * 1000, 3)
+                    if self.build_seconds is not None else None,
+                'refreshes': self.refreshes,
+            }
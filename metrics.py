@@ -0,0 +1,119 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Request metrics
+
+QueryStats collects what a single request did in the database. RequestMetrics
+aggregates finished requests into per-route latency histograms and counters
+and renders them in the Prometheus text exposition format for /metrics.
+Metrics are kept per process, so with several gunicorn workers each worker
+reports its own share and Prometheus sums them.
+"""
+
+import threading
+
+# Upper bounds in seconds, shared by the request and database histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryStats:
+    """Statements run during one request: count, total time and the slowest one"""
+
+    def __init__(self):
+        self.statements = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def add(self, statement, seconds):
+        self.statements += 1
+        self.total += seconds
+        if seconds >= self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self, request_seconds):
+        """Value for the Server-Timing response header"""
+        return ', '.join([
+            f'db;dur={self.total * 1000:.3f};desc="{self.statements} statement(s)"',
+            f'db-slowest;dur={self.slowest * 1000:.3f}',
+            f'total;dur={request_seconds * 1000:.3f}',
+        ])
+
+
+class Histogram:
+    """Cumulative histogram with one series per label tuple"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self, name, label_names):
+        for labels, (counts, total) in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, counts):
+                yield f'{name}_bucket{format_labels(label_names, labels, le=bound)} {count}'
+            yield f'{name}_bucket{format_labels(label_names, labels, le="+Inf")} {counts[-1]}'
+            yield f'{name}_sum{format_labels(label_names, labels)} {total:.6f}'
+            yield f'{name}_count{format_labels(label_names, labels)} {counts[-1]}'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, le=None):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class RequestMetrics:
+    """Thread-safe per-route aggregation of finished requests"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_seconds = Histogram()
+        self.db_seconds = Histogram()
+        self.requests = {}
+        self.statements = {}
+
+    def observe(self, route, method, status, seconds, stats):
+        with self.lock:
+            self.request_seconds.observe((route, method), seconds)
+            self.db_seconds.observe((route, method), stats.total)
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.statements[(route, method)] = (
+                self.statements.get((route, method), 0) + stats.statements
+            )
+
+    def render(self, gauges=None):
+        """Prometheus text format; gauges is an optional {name: number} dict"""
+        lines = []
+        with self.lock:
+            lines += ['# HELP http_request_duration_seconds Request latency by route.',
+                      '# TYPE http_request_duration_seconds histogram']
+            lines += self.request_seconds.render('http_request_duration_seconds',
+                                                 ('route', 'method'))
+            lines += ['# HELP http_requests_total Requests by route and status.',
+                      '# TYPE http_requests_total counter']
+            lines += [f'http_requests_total{format_labels(("route", "method", "status"), key)} '
+                      f'{count}' for key, count in sorted(self.requests.items())]
+            lines += ['# HELP db_request_duration_seconds Database time per request by route.',
+                      '# TYPE db_request_duration_seconds histogram']
+            lines += self.db_seconds.render('db_request_duration_seconds', ('route', 'method'))
+            lines += ['# HELP db_statements_total SQL statements executed by route.',
+                      '# TYPE db_statements_total counter']
+            lines += [f'db_statements_total{format_labels(("route", "method"), key)} {count}'
+                      for key, count in sorted(self.statements.items())]
+        for name, value in (gauges or {}).items():
+            lines += [f'# TYPE {name} gauge', f'{name} {float(value)}']
+        return '\n'.join(lines) + '\n'
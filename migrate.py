@@ -0,0 +1,62 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Schema migrations
+
+Applies the SQL files in migrations/ that have not been applied yet, in
+file name order, and records each one in the schema_migrations table.
+
+Usage:
+    python migrate.py
+"""
+
+from pathlib import Path
+import sys
+
+from sqlalchemy import text
+
+from database import engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / 'migrations'
+
+
+def pending_migrations(conn):
+    """Return the migration files that have not been applied yet"""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(255) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+    applied = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+    return [path for path in sorted(MIGRATIONS_DIR.glob('*.sql')) if path.name not in applied]
+
+
+def migrate():
+    """Apply every pending migration, each in its own transaction"""
+    with engine.begin() as conn:
+        pending = pending_migrations(conn)
+
+    if not pending:
+        print("✓ Schema is up to date")
+        return
+
+    for path in pending:
+        print(f"Applying {path.name}...")
+        with engine.begin() as conn:
+            # Straight to the DBAPI cursor without parameters, so a literal %
+            # (e.g. format('%I', ...) in PL/pgSQL) is not taken for a placeholder
+            conn.connection.cursor().execute(path.read_text())
+            conn.execute(
+                text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                {'name': path.name}
+            )
+    print(f"✓ Applied {len(pending)} migration(s)")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        # The database's own message, with its DETAIL and HINT lines
+        print(f"✗ Error: {getattr(e, 'orig', e)}")
+        sys.exit(1)
@@ -0,0 +1,12 @@
+-- Indexes matching the sort order of the paginated list pages, so each
+-- page is a bounded index range scan instead of a full sort.
+-- users, caregiver, member, address and job page on their primary keys.
+
+-- /job_applications pages on (job_id, caregiver_user_id); the primary key
+-- is (caregiver_user_id, job_id), which is the wrong way round.
+CREATE INDEX IF NOT EXISTS job_application_job_id_caregiver_idx
+    ON job_application (job_id, caregiver_user_id);
+
+-- /appointments pages on (appointment_date DESC, appointment_time, appointment_id)
+CREATE INDEX IF NOT EXISTS appointment_list_order_idx
+    ON appointment (appointment_date DESC, appointment_time, appointment_id);
@@ -0,0 +1,20 @@
+-- Indexes behind the typeahead endpoints (/api/lookup/<kind>) that replace
+-- the full-table dropdowns on the create forms.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Substring search (3+ characters) over name and email
+CREATE INDEX IF NOT EXISTS users_lookup_trgm_idx
+    ON users USING gin (lower(given_name || ' ' || surname || ' ' || email) gin_trgm_ops);
+
+-- Prefix search for one or two characters
+CREATE INDEX IF NOT EXISTS users_given_name_prefix_idx
+    ON users (lower(given_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS users_surname_prefix_idx
+    ON users (lower(surname) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS users_email_prefix_idx
+    ON users (lower(email) text_pattern_ops);
+
+-- Jobs looked up by the member who posted them
+CREATE INDEX IF NOT EXISTS job_member_user_id_idx
+    ON job (member_user_id);
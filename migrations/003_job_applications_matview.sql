@@ -0,0 +1,31 @@
+-- job_applications_view becomes a materialized view so the application
+-- listing is served by an index scan instead of a four-way join per read.
+-- The unique index is what allows REFRESH MATERIALIZED VIEW CONCURRENTLY,
+-- so readers are never blocked while the web app refreshes it after writes.
+
+-- Older databases have the plain view created by main.py section 8
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('job_applications_view')) = 'v' THEN
+        DROP VIEW job_applications_view;
+    END IF;
+END
+$$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS job_applications_view AS
+SELECT 
+    ja.caregiver_user_id,
+    ja.job_id,
+    ja.date_applied,
+    u.given_name || ' ' || u.surname AS applicant_name,
+    j.required_caregiving_type,
+    m_u.given_name || ' ' || m_u.surname AS member_name
+FROM job_application ja
+JOIN caregiver cg ON ja.caregiver_user_id = cg.caregiver_user_id
+JOIN users u ON cg.caregiver_user_id = u.user_id
+JOIN job j ON ja.job_id = j.job_id
+JOIN member m ON j.member_user_id = m.member_user_id
+JOIN users m_u ON m.member_user_id = m_u.user_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS job_applications_view_pkey
+    ON job_applications_view (job_id, caregiver_user_id);
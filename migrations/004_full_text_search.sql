@@ -0,0 +1,13 @@
+-- Full-text search over free-text columns, used by /search in app.py and
+-- by queries 5.2 and 5.4 in main.py. Expression indexes rather than stored
+-- tsvector columns, so SELECT * and the exports do not change shape; queries
+-- must use exactly these expressions to hit the indexes.
+
+CREATE INDEX IF NOT EXISTS job_other_requirements_fts_idx
+    ON job USING gin (to_tsvector('english', coalesce(other_requirements, '')));
+
+CREATE INDEX IF NOT EXISTS member_house_rules_fts_idx
+    ON member USING gin (to_tsvector('english', coalesce(house_rules, '')));
+
+CREATE INDEX IF NOT EXISTS users_profile_description_fts_idx
+    ON users USING gin (to_tsvector('english', coalesce(profile_description, '')));
@@ -0,0 +1,119 @@
+-- caregiver_earnings keeps the accepted-appointment totals per caregiver so
+-- the earnings reports (main.py 6.2, 6.3, 6.4 and 7) read one row per
+-- caregiver instead of aggregating every appointment on each run.
+--
+-- Invariants, per caregiver with at least one accepted appointment:
+--   accepted_appointments = count of accepted appointments
+--   accepted_hours        = sum of their work_hours
+--   accepted_cost         = accepted_hours * caregiver.hourly_rate
+--
+-- The triggers are statement-level with transition tables, so a bulk
+-- INSERT or UPDATE touches each caregiver's row once per statement rather
+-- than once per appointment. Transition tables cannot be combined with
+-- UPDATE OF column lists; an UPDATE that leaves status and work_hours
+-- alone subtracts and re-adds the same amounts.
+
+CREATE TABLE IF NOT EXISTS caregiver_earnings (
+    caregiver_user_id INT PRIMARY KEY
+        REFERENCES caregiver(caregiver_user_id) ON DELETE CASCADE,
+    accepted_appointments INT NOT NULL DEFAULT 0,
+    accepted_hours NUMERIC NOT NULL DEFAULT 0,
+    accepted_cost NUMERIC NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION caregiver_earnings_from_appointments() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE caregiver_earnings e
+        SET accepted_appointments = e.accepted_appointments - d.appointments,
+            accepted_hours = e.accepted_hours - d.hours,
+            accepted_cost = e.accepted_cost - d.hours * c.hourly_rate
+        FROM (
+            SELECT caregiver_user_id, count(*) AS appointments, sum(work_hours) AS hours
+            FROM old_rows
+            WHERE status = 'accepted'
+            GROUP BY caregiver_user_id
+        ) d
+        JOIN caregiver c ON c.caregiver_user_id = d.caregiver_user_id
+        WHERE e.caregiver_user_id = d.caregiver_user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO caregiver_earnings
+            (caregiver_user_id, accepted_appointments, accepted_hours, accepted_cost)
+        SELECT d.caregiver_user_id, d.appointments, d.hours, d.hours * c.hourly_rate
+        FROM (
+            SELECT caregiver_user_id, count(*) AS appointments, sum(work_hours) AS hours
+            FROM new_rows
+            WHERE status = 'accepted'
+            GROUP BY caregiver_user_id
+        ) d
+        JOIN caregiver c ON c.caregiver_user_id = d.caregiver_user_id
+        ON CONFLICT (caregiver_user_id) DO UPDATE
+        SET accepted_appointments = caregiver_earnings.accepted_appointments
+                                    + EXCLUDED.accepted_appointments,
+            accepted_hours = caregiver_earnings.accepted_hours + EXCLUDED.accepted_hours,
+            accepted_cost = caregiver_earnings.accepted_cost + EXCLUDED.accepted_cost;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION caregiver_earnings_from_rates() RETURNS trigger AS $$
+BEGIN
+    UPDATE caregiver_earnings e
+    SET accepted_cost = e.accepted_hours * n.hourly_rate
+    FROM new_rows n
+    JOIN old_rows o ON o.caregiver_user_id = n.caregiver_user_id
+    WHERE e.caregiver_user_id = n.caregiver_user_id
+      AND o.hourly_rate IS DISTINCT FROM n.hourly_rate;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION caregiver_earnings_truncate() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM caregiver_earnings;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointment_earnings_insert ON appointment;
+CREATE TRIGGER appointment_earnings_insert
+    AFTER INSERT ON appointment
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION caregiver_earnings_from_appointments();
+
+DROP TRIGGER IF EXISTS appointment_earnings_update ON appointment;
+CREATE TRIGGER appointment_earnings_update
+    AFTER UPDATE ON appointment
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION caregiver_earnings_from_appointments();
+
+DROP TRIGGER IF EXISTS appointment_earnings_delete ON appointment;
+CREATE TRIGGER appointment_earnings_delete
+    AFTER DELETE ON appointment
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION caregiver_earnings_from_appointments();
+
+DROP TRIGGER IF EXISTS appointment_earnings_truncate ON appointment;
+CREATE TRIGGER appointment_earnings_truncate
+    AFTER TRUNCATE ON appointment
+    FOR EACH STATEMENT EXECUTE FUNCTION caregiver_earnings_truncate();
+
+DROP TRIGGER IF EXISTS caregiver_earnings_rate ON caregiver;
+CREATE TRIGGER caregiver_earnings_rate
+    AFTER UPDATE ON caregiver
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION caregiver_earnings_from_rates();
+
+-- Backfill from the appointments already in the database
+TRUNCATE caregiver_earnings;
+INSERT INTO caregiver_earnings
+    (caregiver_user_id, accepted_appointments, accepted_hours, accepted_cost)
+SELECT a.caregiver_user_id, count(*), sum(a.work_hours), sum(a.work_hours) * c.hourly_rate
+FROM appointment a
+JOIN caregiver c ON c.caregiver_user_id = a.caregiver_user_id
+WHERE a.status = 'accepted'
+GROUP BY a.caregiver_user_id, c.hourly_rate;
@@ -0,0 +1,41 @@
+-- table_versions holds a change counter and modification time per table,
+-- bumped by a statement-level trigger on every write (including cascaded
+-- deletes, bulk COPY loads and TRUNCATE). The web app derives ETags from
+-- it, so a poll of an unchanged page costs one primary-key lookup instead
+-- of the page's query and template render, and the answer is the same in
+-- every gunicorn worker and after writes made by main.py or the CLI tools.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    last_modified TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, last_modified)
+    VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1,
+        last_modified = clock_timestamp();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    name TEXT;
+BEGIN
+    FOREACH name IN ARRAY ARRAY['users', 'caregiver', 'member', 'address', 'job',
+                                'job_application', 'appointment']
+    LOOP
+        INSERT INTO table_versions (table_name) VALUES (name) ON CONFLICT DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', name || '_version', name);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()',
+            name || '_version', name
+        );
+    END LOOP;
+END
+$$;
@@ -0,0 +1,25 @@
+-- purge_job records the progress of each purge.py run. The row is updated
+-- in the same transaction as the batch it describes, so after an
+-- interruption last_id is exactly where the committed deletes stopped and
+-- a rerun under the same name carries on from there.
+
+CREATE TABLE IF NOT EXISTS purge_job (
+    name VARCHAR(100) PRIMARY KEY,
+    target VARCHAR(50) NOT NULL,
+    predicate TEXT NOT NULL,
+    last_id INT NOT NULL DEFAULT 0,
+    batches INT NOT NULL DEFAULT 0,
+    rows_deleted BIGINT NOT NULL DEFAULT 0,
+    seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+-- Cascading deletes find a member's or caregiver's appointments by these
+-- columns, and so do the foreign key checks that follow every delete from
+-- member or caregiver. Without them each deleted row scans appointment.
+CREATE INDEX IF NOT EXISTS appointment_member_user_id_idx
+    ON appointment (member_user_id);
+CREATE INDEX IF NOT EXISTS appointment_caregiver_user_id_idx
+    ON appointment (caregiver_user_id);
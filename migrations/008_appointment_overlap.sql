@@ -0,0 +1,54 @@
+-- A caregiver cannot be booked into two appointments whose time slots
+-- overlap. The slot is derived from date, start time and work_hours and
+-- checked by a GiST exclusion constraint on (caregiver_user_id, slot), so
+-- each insert or update is one index probe however large appointment
+-- grows. Declined appointments do not hold their slot.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+CREATE OR REPLACE FUNCTION appointment_slot(day DATE, starts TIME, hours NUMERIC)
+RETURNS tsrange AS $$
+    SELECT tsrange(day + starts, day + starts + hours * INTERVAL '1 hour')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Existing double bookings would stop the constraint from being created.
+-- Which appointment of a pair should give way is for a person to decide,
+-- so list them and stop; decline or reschedule them and run it again.
+DO $$
+DECLARE
+    total INT;
+    conflicts TEXT;
+BEGIN
+    SELECT count(*),
+           string_agg(format('  %s and %s (caregiver %s)', first_id, second_id, caregiver_user_id),
+                      E'\n' ORDER BY n) FILTER (WHERE n <= 20)
+    INTO total, conflicts
+    FROM (
+        SELECT a.appointment_id AS first_id, b.appointment_id AS second_id, a.caregiver_user_id,
+               row_number() OVER (ORDER BY a.appointment_id, b.appointment_id) AS n
+        FROM appointment a
+        JOIN appointment b ON b.caregiver_user_id = a.caregiver_user_id
+                          AND b.appointment_id > a.appointment_id
+        WHERE a.status IS DISTINCT FROM 'declined'
+          AND b.status IS DISTINCT FROM 'declined'
+          AND appointment_slot(a.appointment_date, a.appointment_time, a.work_hours)
+              && appointment_slot(b.appointment_date, b.appointment_time, b.work_hours)
+    ) pairs;
+
+    IF total > 0 THEN
+        RAISE EXCEPTION '% pair(s) of appointments overlap; appointment_no_overlap cannot be added',
+                        total
+            USING DETAIL = CASE WHEN total > 20 THEN E'The first 20:\n' ELSE E'Appointment ids:\n' END
+                           || conflicts,
+                  HINT = 'Decline or reschedule one appointment of each pair, '
+                         'then run python migrate.py again.';
+    END IF;
+END
+$$;
+
+ALTER TABLE appointment DROP CONSTRAINT IF EXISTS appointment_no_overlap;
+ALTER TABLE appointment ADD CONSTRAINT appointment_no_overlap
+    EXCLUDE USING gist (
+        caregiver_user_id WITH =,
+        appointment_slot(appointment_date, appointment_time, work_hours) WITH &&
+    ) WHERE (status IS DISTINCT FROM 'declined');
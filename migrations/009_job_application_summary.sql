@@ -0,0 +1,167 @@
+-- job_application_summary replaces the materialized job_applications_view
+-- of migration 003. REFRESH MATERIALIZED VIEW CONCURRENTLY recomputes the
+-- whole four-way join and diffs it on every refresh, so each job
+-- application write paid for every application in the database and
+-- concurrent refreshes serialized those writes. Statement-level triggers
+-- with transition tables now apply each write's own rows to the summary
+-- in the same transaction, so the cost follows the rows written.
+--
+-- Invariant: one summary row per job_application row, carrying
+--   applicant_name           = the caregiver's given_name || ' ' || surname
+--   required_caregiving_type = the job's required_caregiving_type
+--   member_name              = the job's member's given_name || ' ' || surname,
+--                              NULL while the job has no member
+--
+-- Rows only leave job_application through its own DELETE or TRUNCATE
+-- (purge.py and the app delete applications explicitly before their jobs
+-- and caregivers), so the triggers on users and job only have to follow
+-- name and job changes. job_applications_view stays as a plain view over
+-- the summary for main.py section 8.
+
+CREATE TABLE IF NOT EXISTS job_application_summary (
+    caregiver_user_id INT NOT NULL,
+    job_id INT NOT NULL,
+    date_applied DATE,
+    applicant_name TEXT,
+    required_caregiving_type VARCHAR(50),
+    member_name TEXT,
+    PRIMARY KEY (job_id, caregiver_user_id)
+);
+
+-- For renaming a caregiver's applications
+CREATE INDEX IF NOT EXISTS job_application_summary_caregiver_idx
+    ON job_application_summary (caregiver_user_id);
+
+CREATE OR REPLACE FUNCTION job_application_summary_rows() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM job_application_summary s
+        USING old_rows o
+        WHERE s.job_id = o.job_id AND s.caregiver_user_id = o.caregiver_user_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO job_application_summary
+        SELECT n.caregiver_user_id, n.job_id, n.date_applied,
+               u.given_name || ' ' || u.surname,
+               j.required_caregiving_type,
+               m_u.given_name || ' ' || m_u.surname
+        FROM new_rows n
+        JOIN users u ON u.user_id = n.caregiver_user_id
+        JOIN job j ON j.job_id = n.job_id
+        LEFT JOIN users m_u ON m_u.user_id = j.member_user_id;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION job_application_summary_jobs() RETURNS trigger AS $$
+BEGIN
+    UPDATE job_application_summary s
+    SET required_caregiving_type = n.required_caregiving_type,
+        member_name = m_u.given_name || ' ' || m_u.surname
+    FROM new_rows n
+    JOIN old_rows o ON o.job_id = n.job_id
+    LEFT JOIN users m_u ON m_u.user_id = n.member_user_id
+    WHERE s.job_id = n.job_id
+      AND (o.required_caregiving_type IS DISTINCT FROM n.required_caregiving_type
+           OR o.member_user_id IS DISTINCT FROM n.member_user_id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION job_application_summary_names() RETURNS trigger AS $$
+BEGIN
+    -- Only users whose name changed; most user updates leave it alone
+    UPDATE job_application_summary s
+    SET applicant_name = n.given_name || ' ' || n.surname
+    FROM new_rows n
+    JOIN old_rows o ON o.user_id = n.user_id
+    WHERE s.caregiver_user_id = n.user_id
+      AND (o.given_name IS DISTINCT FROM n.given_name OR o.surname IS DISTINCT FROM n.surname);
+
+    UPDATE job_application_summary s
+    SET member_name = n.given_name || ' ' || n.surname
+    FROM new_rows n
+    JOIN old_rows o ON o.user_id = n.user_id
+    JOIN job j ON j.member_user_id = n.user_id
+    WHERE s.job_id = j.job_id
+      AND (o.given_name IS DISTINCT FROM n.given_name OR o.surname IS DISTINCT FROM n.surname);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION job_application_summary_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE job_application_summary;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS job_application_summary_insert ON job_application;
+CREATE TRIGGER job_application_summary_insert
+    AFTER INSERT ON job_application
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_rows();
+
+DROP TRIGGER IF EXISTS job_application_summary_update ON job_application;
+CREATE TRIGGER job_application_summary_update
+    AFTER UPDATE ON job_application
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_rows();
+
+DROP TRIGGER IF EXISTS job_application_summary_delete ON job_application;
+CREATE TRIGGER job_application_summary_delete
+    AFTER DELETE ON job_application
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_rows();
+
+DROP TRIGGER IF EXISTS job_application_summary_truncate ON job_application;
+CREATE TRIGGER job_application_summary_truncate
+    AFTER TRUNCATE ON job_application
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_truncate();
+
+DROP TRIGGER IF EXISTS job_application_summary_job ON job;
+CREATE TRIGGER job_application_summary_job
+    AFTER UPDATE ON job
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_jobs();
+
+DROP TRIGGER IF EXISTS job_application_summary_names ON users;
+CREATE TRIGGER job_application_summary_names
+    AFTER UPDATE ON users
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_application_summary_names();
+
+-- Versioned like the base tables (migration 006), for ETags and the app's caches
+INSERT INTO table_versions (table_name) VALUES ('job_application_summary')
+ON CONFLICT DO NOTHING;
+DROP TRIGGER IF EXISTS job_application_summary_version ON job_application_summary;
+CREATE TRIGGER job_application_summary_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON job_application_summary
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Backfill, and swap the materialized view for a plain view over the summary
+TRUNCATE job_application_summary;
+INSERT INTO job_application_summary
+SELECT ja.caregiver_user_id, ja.job_id, ja.date_applied,
+       u.given_name || ' ' || u.surname,
+       j.required_caregiving_type,
+       m_u.given_name || ' ' || m_u.surname
+FROM job_application ja
+JOIN users u ON u.user_id = ja.caregiver_user_id
+JOIN job j ON j.job_id = ja.job_id
+LEFT JOIN users m_u ON m_u.user_id = j.member_user_id;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('job_applications_view')) = 'm' THEN
+        DROP MATERIALIZED VIEW job_applications_view;
+    END IF;
+END
+$$;
+CREATE OR REPLACE VIEW job_applications_view AS
+SELECT caregiver_user_id, job_id, date_applied, applicant_name,
+       required_caregiving_type, member_name
+FROM job_application_summary;
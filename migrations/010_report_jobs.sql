@@ -0,0 +1,29 @@
+-- report_job holds the background report jobs of the web application
+-- (report_jobs.py). Web workers insert and read the rows, the report
+-- worker process claims and runs them, so every process sees every job
+-- and the ids, from one sequence, are unique across all of them. rows
+-- holds a finished job's result as a JSON array of arrays, in columns'
+-- order.
+
+CREATE TABLE IF NOT EXISTS report_job (
+    job_id BIGSERIAL PRIMARY KEY,
+    query VARCHAR(20) NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'failed', 'timeout', 'cancelled')),
+    timeout_s DOUBLE PRECISION NOT NULL,
+    submitted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    seconds DOUBLE PRECISION,
+    server VARCHAR(10),
+    backend_pid INT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT false,
+    error TEXT,
+    columns TEXT[],
+    row_count INT,
+    rows JSONB
+);
+
+-- Workers take the oldest queued job
+CREATE INDEX IF NOT EXISTS report_job_queued_idx
+    ON report_job (job_id) WHERE status = 'queued';
@@ -0,0 +1,273 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Batched purge
+
+Deletes the jobs or members matching a SQL predicate, together with the
+rows that reference them, in batches of ids walked in key order. Each
+batch is its own short transaction, so row locks are held for one batch
+only and the WAL is written in small pieces; an optional pause between
+batches leaves room for other traffic.
+
+Progress is kept in the purge_job table (migration 007) and updated in
+the batch's transaction. A purge that is interrupted resumes after the
+last committed id when it is run again under the same name; a finished
+one starts over. The predicate is evaluated as the walk goes, so rows
+that start matching behind the cursor are left for the next run.
+
+Usage:
+    python purge.py 4.1
+    python purge.py members --where "a.town = 'Almaty'" --name almaty --pause 0.5
+"""
+
+from collections import namedtuple
+import argparse
+import sys
+import time
+
+from sqlalchemy import text
+
+from database import engine, is_materialized_view
+
+# One statement per table that deletes the rows with the given :ids and
+# everything referencing them. The foreign keys have no ON DELETE action,
+# so the children go in data-modifying CTEs; the keys are only checked
+# once the whole statement has run. All parts read the same snapshot, so
+# a CTE can still find the jobs of a member the main statement deletes.
+# The appointments CTEs return their caregivers for app.DELETE_CASCADES.
+CASCADE_DELETES = {
+    'users': """
+        WITH applications AS (
+            DELETE FROM job_application
+            WHERE caregiver_user_id = ANY(:ids)
+               OR job_id IN (SELECT job_id FROM job WHERE member_user_id = ANY(:ids))
+        ), jobs AS (
+            DELETE FROM job WHERE member_user_id = ANY(:ids)
+        ), appointments AS (
+            DELETE FROM appointment
+            WHERE caregiver_user_id = ANY(:ids) OR member_user_id = ANY(:ids)
+            RETURNING caregiver_user_id
+        ), addresses AS (
+            DELETE FROM address WHERE member_user_id = ANY(:ids)
+        ), caregivers AS (
+            DELETE FROM caregiver WHERE caregiver_user_id = ANY(:ids)
+        ), members AS (
+            DELETE FROM member WHERE member_user_id = ANY(:ids)
+        )
+        DELETE FROM users WHERE user_id = ANY(:ids)
+    """,
+    'caregivers': """
+        WITH applications AS (
+            DELETE FROM job_application WHERE caregiver_user_id = ANY(:ids)
+        ), appointments AS (
+            DELETE FROM appointment WHERE caregiver_user_id = ANY(:ids)
+        )
+        DELETE FROM caregiver WHERE caregiver_user_id = ANY(:ids)
+    """,
+    'members': """
+        WITH applications AS (
+            DELETE FROM job_application
+            WHERE job_id IN (SELECT job_id FROM job WHERE member_user_id = ANY(:ids))
+        ), jobs AS (
+            DELETE FROM job WHERE member_user_id = ANY(:ids)
+        ), appointments AS (
+            DELETE FROM appointment WHERE member_user_id = ANY(:ids)
+            RETURNING caregiver_user_id
+        ), addresses AS (
+            DELETE FROM address WHERE member_user_id = ANY(:ids)
+        )
+        DELETE FROM member WHERE member_user_id = ANY(:ids)
+    """,
+    'jobs': """
+        WITH applications AS (
+            DELETE FROM job_application WHERE job_id = ANY(:ids)
+        )
+        DELETE FROM job WHERE job_id = ANY(:ids)
+    """,
+}
+
+# id:     key walked in order, unique per row of source
+# source: FROM clause the predicate is written against (u is always the
+#         owning user, a the member's address)
+# lock:   alias whose rows are locked between selecting and deleting a batch
+PurgeTarget = namedtuple('PurgeTarget', ['id', 'source', 'lock', 'noun'])
+
+PURGE_TARGETS = {
+    'jobs': PurgeTarget(
+        id='j.job_id',
+        source="""
+            job j
+            JOIN users u ON u.user_id = j.member_user_id
+            LEFT JOIN address a ON a.member_user_id = j.member_user_id
+        """,
+        lock='j',
+        noun='job',
+    ),
+    'members': PurgeTarget(
+        id='m.member_user_id',
+        source="""
+            member m
+            JOIN users u ON u.user_id = m.member_user_id
+            LEFT JOIN address a ON a.member_user_id = m.member_user_id
+        """,
+        lock='m',
+        noun='member',
+    ),
+}
+
+# The deletes of main.py section 4
+PRESETS = {
+    '4.1': ('jobs', "u.given_name = 'Amina' AND u.surname = 'Aminova'"),
+    '4.2': ('members', "a.street = 'Kabanbay Batyr'"),
+}
+
+# seconds covers the batches; refresh_seconds the materialized view refresh
+# after them, which only runs before migration 009
+PurgeReport = namedtuple('PurgeReport', ['name', 'target', 'batches', 'rows_deleted',
+                                         'seconds', 'resumed', 'refresh_seconds'])
+
+
+def start_job(conn, name, target, predicate, restart):
+    """Create or reset the purge_job row, return (last_id, resumed)"""
+    job = conn.execute(
+        text("SELECT target, predicate, last_id, finished_at FROM purge_job WHERE name = :name"),
+        {'name': name}
+    ).fetchone()
+    if job is not None and job.finished_at is None and not restart:
+        if (job.target, job.predicate) != (target, predicate):
+            raise ValueError(f"purge {name!r} is unfinished with a different target or "
+                             f"predicate; pass --restart to start it over")
+        return job.last_id, True
+    conn.execute(
+        text("""
+            INSERT INTO purge_job (name, target, predicate)
+            VALUES (:name, :target, :predicate)
+            ON CONFLICT (name) DO UPDATE
+            SET target = EXCLUDED.target, predicate = EXCLUDED.predicate, last_id = 0,
+                batches = 0, rows_deleted = 0, seconds = 0, started_at = now(),
+                updated_at = now(), finished_at = NULL
+        """),
+        {'name': name, 'target': target, 'predicate': predicate}
+    )
+    return 0, False
+
+
+def batch_query(target, predicate):
+    """SELECT locking the next :limit target ids matching predicate after :after"""
+    spec = PURGE_TARGETS[target]
+    return f"""
+        SELECT {spec.id}
+        FROM {spec.source}
+        WHERE ({predicate}) AND {spec.id} > :after
+        ORDER BY {spec.id}
+        LIMIT :limit
+        FOR UPDATE OF {spec.lock}
+    """
+
+
+def purge(engine, name, target, predicate, batch_size=1000, pause=0.0, restart=False,
+          progress=None):
+    """
+    Delete the target rows matching predicate in batches; see the module
+    docstring. progress, if given, is called with the PurgeReport so far
+    after each batch.
+    """
+    select_batch = text(batch_query(target, predicate))
+    delete_batch = text(CASCADE_DELETES[target])
+    record_batch = text("""
+        UPDATE purge_job
+        SET last_id = :last_id, batches = batches + 1, rows_deleted = rows_deleted + :rows,
+            seconds = seconds + :seconds, updated_at = now()
+        WHERE name = :name
+    """)
+
+    with engine.begin() as conn:
+        last_id, resumed = start_job(conn, name, target, predicate, restart)
+
+    batches = rows_deleted = 0
+    started = time.perf_counter()
+    while True:
+        batch_started = time.perf_counter()
+        with engine.begin() as conn:
+            ids = [row[0] for row in conn.execute(select_batch,
+                                                  {'after': last_id, 'limit': batch_size})]
+            if not ids:
+                conn.execute(text("UPDATE purge_job SET finished_at = now() WHERE name = :name"),
+                             {'name': name})
+                break
+            rows = conn.execute(delete_batch, {'ids': ids}).rowcount
+            last_id = ids[-1]
+            conn.execute(record_batch, {'name': name, 'last_id': last_id, 'rows': rows,
+                                        'seconds': time.perf_counter() - batch_started})
+        batches += 1
+        rows_deleted += rows
+        if progress:
+            progress(PurgeReport(name, target, batches, rows_deleted,
+                                 time.perf_counter() - started, resumed, 0.0))
+        if pause:
+            time.sleep(pause)
+
+    seconds = time.perf_counter() - started
+
+    # Once at the end rather than per batch; the refresh reads every application
+    refresh_seconds = 0.0
+    if rows_deleted:
+        refresh_started = time.perf_counter()
+        with engine.begin() as conn:
+            if is_materialized_view(conn, 'job_applications_view'):
+                conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY job_applications_view"))
+                refresh_seconds = time.perf_counter() - refresh_started
+
+    return PurgeReport(name, target, batches, rows_deleted, seconds, resumed, refresh_seconds)
+
+
+def format_report(report):
+    """One-line summary of a PurgeReport"""
+    rate = report.rows_deleted / report.seconds if report.seconds else 0
+    noun = PURGE_TARGETS[report.target].noun
+    resumed = ', resumed' if report.resumed else ''
+    refresh = (f", then refreshed job_applications_view in {report.refresh_seconds:.2f}s"
+               if report.refresh_seconds else '')
+    return (f"Deleted {report.rows_deleted} {noun}(s) in {report.batches} batch(es), "
+            f"{report.seconds:.2f}s ({rate:,.0f} rows/sec{resumed}){refresh}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Delete jobs or members in batches')
+    parser.add_argument('target', choices=sorted(PRESETS) + sorted(PURGE_TARGETS),
+                        help='a main.py preset or the table to purge')
+    parser.add_argument('--where', help='SQL predicate over the target (required for a table)')
+    parser.add_argument('--name', help='progress record name (default: preset or table)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.1,
+                        help='seconds to sleep between batches (default 0.1)')
+    parser.add_argument('--restart', action='store_true',
+                        help='discard the progress of an unfinished purge of the same name')
+    args = parser.parse_args(argv)
+
+    if args.target in PRESETS:
+        target, predicate = PRESETS[args.target]
+    elif args.where:
+        target, predicate = args.target, args.where
+    else:
+        parser.error('--where is required when purging a table')
+
+    def progress(report):
+        rate = report.rows_deleted / report.seconds if report.seconds else 0
+        print(f"  batch {report.batches}: {report.rows_deleted:,} "
+              f"{PURGE_TARGETS[target].noun}(s), {rate:,.0f} rows/sec", flush=True)
+
+    try:
+        report = purge(engine, args.name or args.target, target, predicate,
+                       args.batch_size, args.pause, args.restart, progress)
+    except KeyboardInterrupt:
+        print("✗ Interrupted; run the same command again to resume")
+        return 130
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return 1
+    print(f"✓ {format_report(report)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - List page and form queries
+
+The SELECTs behind app.py's list pages and update forms. Each view names
+the columns its template shows instead of selecting c.*, m.*, j.* or a.*,
+so a page of caregivers no longer carries every photo path and a page of
+users no longer carries every password and profile description. Free
+text shown as a preview on a list page (a job's other requirements, a
+member's house rules) is cut to PREVIEW_LENGTH characters by PostgreSQL
+rather than by the template.
+
+*_PAGE statements are the SELECT ... FROM ... JOIN part that
+app.fetch_page() adds the seek condition, ORDER BY and LIMIT to; their
+columns must include the ones named by the page's seek keys. *_FORM
+statements read the one row an update form is filled from.
+"""
+
+from statements import statement
+
+PREVIEW_LENGTH = 50
+
+CAREGIVER_NAME = "cg_u.given_name || ' ' || cg_u.surname AS caregiver_name"
+MEMBER_NAME = "m_u.given_name || ' ' || m_u.surname AS member_name"
+
+
+def preview(column, name):
+    """column cut to PREVIEW_LENGTH characters, ending in '...' if it was longer"""
+    return (f"CASE WHEN length({column}) > {PREVIEW_LENGTH} "
+            f"THEN left({column}, {PREVIEW_LENGTH}) || '...' ELSE {column} END AS {name}")
+
+
+def select(name, columns, source):
+    """Register SELECT columns source under name"""
+    return statement(name, 'SELECT ' + ',\n       '.join(columns) + '\n' + source)
+
+
+# ------------------------------------------------------------
+# Column sets
+# ------------------------------------------------------------
+
+USER_LIST_COLUMNS = ('user_id', 'email', 'given_name', 'surname', 'city', 'phone_number')
+# The form posts every column back, password included
+USER_FORM_COLUMNS = USER_LIST_COLUMNS + ('profile_description', 'password')
+
+CAREGIVER_LIST_COLUMNS = ('c.caregiver_user_id', 'u.given_name', 'u.surname', 'u.email', 'u.city',
+                          'c.caregiving_type', 'c.hourly_rate', 'c.gender')
+CAREGIVER_FORM_COLUMNS = ('c.caregiver_user_id', 'u.given_name', 'u.surname', 'c.photo',
+                          'c.gender', 'c.caregiving_type', 'c.hourly_rate')
+
+MEMBER_LIST_COLUMNS = ('m.member_user_id', 'u.given_name', 'u.surname', 'u.email', 'u.city',
+                       'u.phone_number', preview('m.house_rules', 'house_rules_preview'))
+MEMBER_FORM_COLUMNS = ('m.member_user_id', 'u.given_name', 'u.surname', 'm.house_rules',
+                       'm.dependent_description')
+
+ADDRESS_COLUMNS = ('a.member_user_id', 'u.given_name', 'u.surname', 'a.house_number',
+                   'a.street', 'a.town')
+
+JOB_LIST_COLUMNS = ('j.job_id', 'u.given_name', 'u.surname', 'u.email',
+                    'j.required_caregiving_type',
+                    preview('j.other_requirements', 'other_requirements_preview'),
+                    'j.date_posted')
+JOB_FORM_COLUMNS = ('job_id', 'required_caregiving_type', 'other_requirements', 'date_posted')
+
+JOB_APPLICATION_COLUMNS = ('ja.caregiver_user_id', 'ja.job_id', 'ja.date_applied',
+                           CAREGIVER_NAME, MEMBER_NAME, 'j.required_caregiving_type')
+# job_application_summary (migration 009, behind job_applications_view) already
+# holds the names and type joined in
+JOB_APPLICATION_VIEW_COLUMNS = ('jav.caregiver_user_id', 'jav.job_id', 'jav.date_applied',
+                                'jav.applicant_name AS caregiver_name', 'jav.member_name',
+                                'jav.required_caregiving_type')
+
+APPOINTMENT_COLUMNS = ('a.appointment_id', CAREGIVER_NAME, MEMBER_NAME, 'a.appointment_date',
+                       'a.appointment_time', 'a.work_hours', 'a.status')
+
+
+# ------------------------------------------------------------
+# Sources
+# ------------------------------------------------------------
+
+CAREGIVER_SOURCE = """FROM caregiver c
+JOIN users u ON c.caregiver_user_id = u.user_id"""
+
+MEMBER_SOURCE = """FROM member m
+JOIN users u ON m.member_user_id = u.user_id"""
+
+ADDRESS_SOURCE = """FROM address a
+JOIN member m ON a.member_user_id = m.member_user_id
+JOIN users u ON m.member_user_id = u.user_id"""
+
+JOB_SOURCE = """FROM job j
+JOIN member m ON j.member_user_id = m.member_user_id
+JOIN users u ON m.member_user_id = u.user_id"""
+
+JOB_APPLICATION_SOURCE = """FROM job_application ja
+JOIN caregiver cg ON ja.caregiver_user_id = cg.caregiver_user_id
+JOIN users cg_u ON cg.caregiver_user_id = cg_u.user_id
+JOIN job j ON ja.job_id = j.job_id
+JOIN member m ON j.member_user_id = m.member_user_id
+JOIN users m_u ON m.member_user_id = m_u.user_id"""
+
+APPOINTMENT_SOURCE = """FROM appointment a
+JOIN caregiver cg ON a.caregiver_user_id = cg.caregiver_user_id
+JOIN users cg_u ON cg.caregiver_user_id = cg_u.user_id
+JOIN member m ON a.member_user_id = m.member_user_id
+JOIN users m_u ON m.member_user_id = m_u.user_id"""
+
+
+# ------------------------------------------------------------
+# Statements
+# ------------------------------------------------------------
+
+USERS_PAGE = select('users_page', USER_LIST_COLUMNS, 'FROM users')
+USER_FORM = select('user_form', USER_FORM_COLUMNS, 'FROM users WHERE user_id = :user_id')
+
+CAREGIVERS_PAGE = select('caregivers_page', CAREGIVER_LIST_COLUMNS, CAREGIVER_SOURCE)
+CAREGIVER_FORM = select('caregiver_form', CAREGIVER_FORM_COLUMNS,
+                        CAREGIVER_SOURCE + '\nWHERE c.caregiver_user_id = :caregiver_user_id')
+
+MEMBERS_PAGE = select('members_page', MEMBER_LIST_COLUMNS, MEMBER_SOURCE)
+MEMBER_FORM = select('member_form', MEMBER_FORM_COLUMNS,
+                     MEMBER_SOURCE + '\nWHERE m.member_user_id = :member_user_id')
+
+ADDRESSES_PAGE = select('addresses_page', ADDRESS_COLUMNS, ADDRESS_SOURCE)
+ADDRESS_FORM = select('address_form', ADDRESS_COLUMNS,
+                      ADDRESS_SOURCE + '\nWHERE a.member_user_id = :member_user_id')
+
+JOBS_PAGE = select('jobs_page', JOB_LIST_COLUMNS, JOB_SOURCE)
+JOB_FORM = select('job_form', JOB_FORM_COLUMNS, 'FROM job WHERE job_id = :job_id')
+
+JOB_APPLICATIONS_PAGE = select('job_applications_page', JOB_APPLICATION_COLUMNS,
+                               JOB_APPLICATION_SOURCE)
+JOB_APPLICATIONS_VIEW_PAGE = select('job_applications_view_page', JOB_APPLICATION_VIEW_COLUMNS,
+                                    'FROM job_application_summary jav')
+
+APPOINTMENTS_PAGE = select('appointments_page', APPOINTMENT_COLUMNS, APPOINTMENT_SOURCE)
+APPOINTMENT_FORM = select('appointment_form', APPOINTMENT_COLUMNS,
+                          APPOINTMENT_SOURCE + '\nWHERE a.appointment_id = :appointment_id')
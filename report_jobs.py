@@ -0,0 +1,374 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Background report jobs
+
+Report queries (reports.REPORT_QUERIES) submitted through the web app run
+in a worker process of their own, so a long aggregate never occupies a
+web worker, its threads or a connection the CRUD pages are waiting for.
+The threads only wait on PostgreSQL; the heavy lifting happens in the
+database.
+
+Jobs are rows of the report_job table (migration 010). The web app
+inserts them; a worker thread claims the oldest queued one with FOR
+UPDATE SKIP LOCKED and stores the result rows back as JSON. The ids come
+from the table's sequence, so they are unique across processes and any
+web worker can show, cancel or download any job. Finished jobs beyond
+the newest MAX_JOBS are deleted as new ones are submitted.
+
+Every job runs in a READ ONLY transaction with statement_timeout set to
+the job's timeout. Cancelling a queued job marks it cancelled; cancelling
+a running one also sends pg_cancel_backend() to its connection, on the
+server the job runs on. With a replica configured, a job runs there if
+the lag guard allows it when the job starts.
+
+While a thread runs a job it holds an advisory lock on the job id. A
+running job whose lock is free belonged to a worker that has stopped;
+the next poll of any worker marks it failed.
+
+    REPORT_WORKERS          jobs run at the same time (default 2)
+    REPORT_POLL_INTERVAL    seconds an idle thread waits before looking
+                            for a queued job again (default 0.5)
+    REPORT_MAX_JOBS         finished jobs kept (default 100)
+
+Usage:
+    python report_jobs.py
+    python report_jobs.py --workers 4
+"""
+
+from collections import namedtuple
+from datetime import date, time
+from decimal import Decimal
+import argparse
+import json
+import os
+import sys
+import threading
+import time as clock
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from reports import REPORT_STATEMENTS
+
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+POLL_INTERVAL = float(os.environ.get('REPORT_POLL_INTERVAL', 0.5))
+MAX_JOBS = int(os.environ.get('REPORT_MAX_JOBS', 100))
+
+# queued -> running -> done | failed | timeout | cancelled
+FINISHED = ('done', 'failed', 'timeout', 'cancelled')
+
+JOB_COLUMNS = """job_id, query, status, timeout_s, submitted_at, started_at, finished_at,
+                 seconds, server, error, columns, row_count"""
+
+
+class JobCancelled(Exception):
+    """Raised in a worker whose job was cancelled before its query started"""
+
+
+class ReportJob(namedtuple('ReportJob', ['id', 'key', 'status', 'timeout', 'submitted',
+                                         'started', 'finished', 'seconds', 'server', 'error',
+                                         'columns', 'row_count', 'rows'])):
+    """One row of report_job; rows is only loaded for downloads"""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'query': self.key,
+            'status': self.status,
+            'timeout_s': self.timeout,
+            'submitted': self.submitted.isoformat(timespec='seconds'),
+            'started': self.started.isoformat(timespec='seconds') if self.started else None,
+            'finished': self.finished.isoformat(timespec='seconds') if self.finished else None,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'rows': self.row_count,
+            'server': self.server,
+            'error': self.error,
+        }
+
+
+def job_from_row(row, rows=None):
+    return ReportJob(row.job_id, row.query, row.status, row.timeout_s, row.submitted_at,
+                     row.started_at, row.finished_at, row.seconds, row.server, row.error,
+                     row.columns, row.row_count, rows)
+
+
+# ============================================================
+# JOB STORE (used by the web app)
+# ============================================================
+
+def submit(engine, key, timeout, max_jobs=MAX_JOBS):
+    """Queue report key, forget the oldest finished jobs, return the new ReportJob"""
+    with engine.begin() as conn:
+        row = conn.execute(text(f"""
+            INSERT INTO report_job (query, timeout_s) VALUES (:key, :timeout)
+            RETURNING {JOB_COLUMNS}
+        """), {'key': key, 'timeout': timeout}).one()
+        conn.execute(text("""
+            DELETE FROM report_job
+            WHERE job_id IN (SELECT job_id FROM report_job
+                             WHERE status NOT IN ('queued', 'running')
+                             ORDER BY job_id DESC OFFSET :keep)
+        """), {'keep': max_jobs})
+    return job_from_row(row)
+
+
+def get(engine, job_id, rows=False):
+    """The job with job_id, with its result rows if rows is true; None if there is none"""
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(f"SELECT {JOB_COLUMNS}{', rows' if rows else ''} "
+                 f"FROM report_job WHERE job_id = :job_id"),
+            {'job_id': job_id}
+        ).fetchone()
+    if row is None:
+        return None
+    return job_from_row(row, row.rows if rows else None)
+
+
+def recent(engine, limit=MAX_JOBS):
+    """Jobs newest first, without their rows"""
+    with engine.connect() as conn:
+        result = conn.execute(
+            text(f"SELECT {JOB_COLUMNS} FROM report_job ORDER BY job_id DESC LIMIT :limit"),
+            {'limit': limit}
+        )
+        return [job_from_row(row) for row in result]
+
+
+def cancel(engine, job_id, replica=None):
+    """
+    Cancel a queued or running job; False if it had already finished.
+
+    The row stays locked until the running query has been cancelled, so
+    the worker cannot record the job as finished and hand its connection
+    to the next job in between.
+    """
+    with engine.begin() as conn:
+        job = conn.execute(text("""
+            UPDATE report_job
+            SET cancel_requested = true,
+                status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                finished_at = CASE WHEN status = 'queued' THEN now() ELSE finished_at END
+            WHERE job_id = :job_id AND status IN ('queued', 'running')
+            RETURNING status, server, backend_pid
+        """), {'job_id': job_id}).fetchone()
+        if job is None:
+            return False
+        if job.backend_pid is not None:
+            cancel_sql = text("SELECT pg_cancel_backend(:pid)")
+            if job.server == 'replica' and replica is not None:
+                with replica.connect() as replica_conn:
+                    replica_conn.execute(cancel_sql, {'pid': job.backend_pid})
+            else:
+                conn.execute(cancel_sql, {'pid': job.backend_pid})
+    return True
+
+
+def stats(engine):
+    """Number of jobs per status"""
+    with engine.connect() as conn:
+        return dict(conn.execute(
+            text("SELECT status, count(*) FROM report_job GROUP BY status")
+        ).all())
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+def json_default(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class ReportWorker:
+    """Threads that claim and run queued jobs; see the module docstring"""
+
+    def __init__(self, store, engine, replica=None, use_replica=None, workers=REPORT_WORKERS,
+                 poll=POLL_INTERVAL):
+        self.store = store
+        self.engine = engine
+        self.replica = replica
+        self.use_replica = use_replica
+        self.workers = workers
+        self.poll = poll
+        self.stopping = threading.Event()
+
+    def serve(self):
+        """Run workers threads until stop() is called"""
+        threads = [threading.Thread(target=self.work, name=f'report-{n}', daemon=True)
+                   for n in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        self.stopping.set()
+
+    def work(self):
+        while not self.stopping.is_set():
+            try:
+                ran = self.run_next()
+            except Exception as e:
+                print(f"✗ Error: {e}", file=sys.stderr)
+                ran = False
+            if not ran:
+                self.stopping.wait(self.poll)
+
+    def run_next(self):
+        """Run the oldest queued job, if there is one; True if a job was run"""
+        with self.store.connect() as control:
+            # Claim and lock in one transaction: once others see the job
+            # running, the lock that says its worker is alive is held
+            with control.begin():
+                self.fail_abandoned(control)
+                job = control.execute(text("""
+                    UPDATE report_job SET status = 'running', started_at = now()
+                    WHERE job_id = (SELECT job_id FROM report_job WHERE status = 'queued'
+                                    ORDER BY job_id LIMIT 1 FOR UPDATE SKIP LOCKED)
+                    RETURNING job_id, query, timeout_s
+                """)).fetchone()
+                if job is None:
+                    return False
+                control.execute(text("SELECT pg_advisory_lock(:job_id)"),
+                                {'job_id': job.job_id})
+            try:
+                self.run(control, job)
+            finally:
+                control.execute(text("SELECT pg_advisory_unlock(:job_id)"),
+                                {'job_id': job.job_id})
+                control.commit()
+        return True
+
+    def fail_abandoned(self, control):
+        """Mark running jobs whose worker has stopped (their lock is free) failed"""
+        control.execute(text("""
+            UPDATE report_job
+            SET status = 'failed', error = 'The report worker stopped while running it',
+                finished_at = now(), backend_pid = NULL
+            WHERE status = 'running' AND pg_try_advisory_xact_lock(job_id)
+        """))
+
+    def run(self, control, job):
+        on_replica = self.replica is not None and (self.use_replica is None
+                                                   or self.use_replica())
+        engine, server = (self.replica, 'replica') if on_replica else (self.engine, 'primary')
+        started = clock.perf_counter()
+        columns = rows = None
+        try:
+            with engine.connect() as conn:
+                try:
+                    statement = REPORT_STATEMENTS.get(job.query)
+                    if statement is None:
+                        raise ValueError(f'Unknown report: {job.query}')
+                    conn.execute(text("SET TRANSACTION READ ONLY"))
+                    conn.execute(text(f"SET LOCAL statement_timeout = {int(job.timeout_s * 1000)}"))
+                    pid = conn.execute(text("SELECT pg_backend_pid()")).scalar()
+                    cancelled = control.execute(text("""
+                        UPDATE report_job SET backend_pid = :pid, server = :server
+                        WHERE job_id = :job_id
+                        RETURNING cancel_requested
+                    """), {'pid': pid, 'server': server, 'job_id': job.job_id}).scalar()
+                    control.commit()
+                    if cancelled:
+                        raise JobCancelled()
+                    result = conn.execute(statement.clause)
+                    columns, rows = list(result.keys()), result.fetchall()
+                    conn.rollback()
+                    status, error = 'done', None
+                except JobCancelled:
+                    status, error = 'cancelled', None
+                except OperationalError as e:
+                    # statement_timeout and pg_cancel_backend() both raise QueryCanceled
+                    if self.cancel_requested(control, job.job_id):
+                        status, error = 'cancelled', None
+                    elif 'statement timeout' in str(e.orig):
+                        status, error = 'timeout', f'Exceeded {job.timeout_s:g}s'
+                    else:
+                        status, error = 'failed', str(e.orig).strip()
+                except Exception as e:
+                    status, error = 'failed', str(getattr(e, 'orig', e)).strip()
+                # Recorded before the connection goes back to the pool; see cancel()
+                self.finish(control, job, status, error, columns, rows,
+                            clock.perf_counter() - started)
+        except Exception as e:
+            # Could not connect, or could not record the outcome
+            control.rollback()
+            self.finish(control, job, 'failed', str(getattr(e, 'orig', e)).strip(), None, None,
+                        clock.perf_counter() - started)
+
+    def cancel_requested(self, control, job_id):
+        # FOR SHARE waits for a cancel() still holding the row to commit
+        cancelled = control.execute(
+            text("SELECT cancel_requested FROM report_job WHERE job_id = :job_id FOR SHARE"),
+            {'job_id': job_id}
+        ).scalar()
+        control.commit()
+        return cancelled
+
+    def finish(self, control, job, status, error, columns, rows, seconds):
+        """
+        Record the outcome, unless cancel() got there first: a cancel that
+        lands after the query returned leaves the job cancelled, as cancel()
+        has already reported. The UPDATE waits for a cancel() holding the
+        row and then sees its cancel_requested.
+        """
+        control.execute(text("""
+            UPDATE report_job
+            SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE :status END,
+                error = CASE WHEN cancel_requested THEN NULL ELSE :error END,
+                columns = CASE WHEN cancel_requested THEN NULL ELSE CAST(:columns AS text[]) END,
+                row_count = CASE WHEN cancel_requested THEN NULL ELSE CAST(:row_count AS int) END,
+                rows = CASE WHEN cancel_requested THEN NULL ELSE CAST(:rows AS jsonb) END,
+                finished_at = now(), seconds = :seconds, backend_pid = NULL
+            WHERE job_id = :job_id
+        """), {
+            'job_id': job.job_id, 'status': status, 'error': error, 'columns': columns,
+            'row_count': len(rows) if rows is not None else None,
+            'rows': (json.dumps([list(row) for row in rows], default=json_default)
+                     if rows is not None else None),
+            'seconds': seconds,
+        })
+        control.commit()
+
+
+def main(argv=None):
+    from database import DATABASE_REPLICA_URL, DATABASE_URL, ReplicaGuard, engine
+
+    parser = argparse.ArgumentParser(description='Run queued report jobs')
+    parser.add_argument('--workers', type=int, default=REPORT_WORKERS,
+                        help=f'jobs run at the same time (default {REPORT_WORKERS})')
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL,
+                        help=f'seconds between looks for queued jobs (default {POLL_INTERVAL:g})')
+    args = parser.parse_args(argv)
+
+    # A pool of their own, so running reports never hold the connections
+    # the job store needs to record their progress
+    report_engine = create_engine(DATABASE_URL, pool_size=args.workers, max_overflow=0,
+                                  pool_pre_ping=True)
+    report_replica_engine = create_engine(DATABASE_REPLICA_URL, pool_size=args.workers,
+                                          max_overflow=0, pool_pre_ping=True) \
+        if DATABASE_REPLICA_URL else None
+    guard = ReplicaGuard(engine, report_replica_engine) if report_replica_engine else None
+    worker = ReportWorker(engine, report_engine, report_replica_engine,
+                          guard.use_replica if guard else None, args.workers, args.poll)
+
+    print(f"✓ Running report jobs on {args.workers} thread(s)", flush=True)
+    try:
+        worker.serve()
+    except KeyboardInterrupt:
+        # Jobs still running are marked failed by the next worker to poll
+        worker.stop()
+        print("✗ Interrupted")
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Report queries
+
+The read-only report queries of main.py sections 5-8. main.py prints
+them, benchmark.py times them and the web application runs them as
+background jobs (report_jobs.py); keeping them here lets the web
+application import them without main.py and its engine.
+"""
+
+from collections import namedtuple
+
+from statements import statement
+
+# heading:     line printed before the query runs
+# description: title of the printed result set
+ReportQuery = namedtuple('ReportQuery', ['heading', 'description', 'sql'])
+
+REPORT_QUERIES = {
+    # 5.1 Select caregiver and member names for accepted appointments
+    '5.1': ReportQuery(
+        "5.1 Caregiver and member names for accepted appointments:",
+        "Accepted Appointments",
+        """
+        SELECT 
+            cg.caregiver_user_id AS caregiver_id,
+            u_cg.given_name || ' ' || u_cg.surname AS caregiver_name,
+            m.member_user_id AS member_id,
+            u_m.given_name || ' ' || u_m.surname AS member_name
+        FROM appointment a
+        JOIN caregiver cg ON a.caregiver_user_id = cg.caregiver_user_id
+        JOIN users u_cg ON cg.caregiver_user_id = u_cg.user_id
+        JOIN member m ON a.member_user_id = m.member_user_id
+        JOIN users u_m ON m.member_user_id = u_m.user_id
+        WHERE a.status = 'accepted'
+        """
+    ),
+    # 5.2 List job_ids containing 'soft-spoken' in other_requirements
+    # The full-text match finds candidates through job_other_requirements_fts_idx,
+    # the LIKE keeps the exact substring semantics of the original query
+    '5.2': ReportQuery(
+        "5.2 Job IDs with 'soft-spoken' in other_requirements:",
+        "Jobs with 'soft-spoken' requirement",
+        """
+        SELECT job_id, other_requirements
+        FROM job
+        WHERE to_tsvector('english', coalesce(other_requirements, ''))
+              @@ phraseto_tsquery('english', 'soft-spoken')
+          AND other_requirements LIKE '%soft-spoken%'
+        """
+    ),
+    # 5.3 List work_hours of all babysitter positions
+    '5.3': ReportQuery(
+        "5.3 Work hours of all babysitter positions:",
+        "Babysitter Work Hours",
+        """
+        SELECT 
+            a.appointment_id,
+            a.work_hours,
+            a.appointment_date,
+            a.appointment_time
+        FROM appointment a
+        JOIN caregiver cg ON a.caregiver_user_id = cg.caregiver_user_id
+        WHERE cg.caregiving_type = 'babysitter'
+        """
+    ),
+    # 5.4 List members looking for Elderly Care in Astana with "No pets." rule
+    # Full-text match through member_house_rules_fts_idx, LIKE for the exact rule
+    '5.4': ReportQuery(
+        "5.4 Members looking for Elderly Care in Astana with 'No pets.' rule:",
+        "Members in Astana seeking Elderly Care with 'No pets.' rule",
+        """
+        SELECT 
+            m.member_user_id,
+            u.given_name || ' ' || u.surname AS member_name,
+            u.city,
+            m.house_rules
+        FROM member m
+        JOIN users u ON m.member_user_id = u.user_id
+        JOIN job j ON m.member_user_id = j.member_user_id
+        WHERE j.required_caregiving_type = 'Elderly Care'
+          AND u.city = 'Astana'
+          AND to_tsvector('english', coalesce(m.house_rules, ''))
+              @@ phraseto_tsquery('english', 'No pets.')
+          AND m.house_rules LIKE '%No pets.%'
+        """
+    ),
+    # 6.1 Count applicants for each job posted by a member
+    '6.1': ReportQuery(
+        "6.1 Number of applicants for each job:",
+        "Job Applicants Count",
+        """
+        SELECT 
+            j.job_id,
+            u.given_name || ' ' || u.surname AS member_name,
+            j.required_caregiving_type,
+            COUNT(ja.caregiver_user_id) AS applicant_count
+        FROM job j
+        JOIN member m ON j.member_user_id = m.member_user_id
+        JOIN users u ON m.member_user_id = u.user_id
+        LEFT JOIN job_application ja ON j.job_id = ja.job_id
+        GROUP BY j.job_id, u.given_name, u.surname, j.required_caregiving_type
+        ORDER BY j.job_id
+        """
+    ),
+    # 6.2 Total hours spent by caregivers for all accepted appointments
+    # 6.2-7 read the per-caregiver totals kept by the caregiver_earnings
+    # triggers (migrations/005_caregiver_earnings.sql) instead of
+    # aggregating every accepted appointment on each run
+    '6.2': ReportQuery(
+        "6.2 Total hours spent by caregivers for accepted appointments:",
+        "Total Hours by Caregiver (Accepted Appointments)",
+        """
+        SELECT 
+            e.caregiver_user_id,
+            u.given_name || ' ' || u.surname AS caregiver_name,
+            e.accepted_hours AS total_hours
+        FROM caregiver_earnings e
+        JOIN users u ON e.caregiver_user_id = u.user_id
+        WHERE e.accepted_appointments > 0
+        ORDER BY total_hours DESC
+        """
+    ),
+    # 6.3 Average pay of caregivers based on accepted appointments
+    # (the average over appointments, so each rate counts once per appointment)
+    '6.3': ReportQuery(
+        "6.3 Average pay of caregivers based on accepted appointments:",
+        "Average Hourly Rate (Accepted Appointments)",
+        """
+        SELECT 
+            SUM(cg.hourly_rate * e.accepted_appointments)
+                / NULLIF(SUM(e.accepted_appointments), 0) AS average_hourly_rate
+        FROM caregiver_earnings e
+        JOIN caregiver cg ON e.caregiver_user_id = cg.caregiver_user_id
+        """
+    ),
+    # 6.4 Caregivers who earn above average based on accepted appointments
+    '6.4': ReportQuery(
+        "6.4 Caregivers earning above average (based on accepted appointments):",
+        "Caregivers Earning Above Average",
+        """
+        WITH average AS (
+            SELECT SUM(cg.hourly_rate * e.accepted_appointments)
+                       / NULLIF(SUM(e.accepted_appointments), 0) AS average_rate
+            FROM caregiver_earnings e
+            JOIN caregiver cg ON e.caregiver_user_id = cg.caregiver_user_id
+        )
+        SELECT 
+            cg.caregiver_user_id,
+            u.given_name || ' ' || u.surname AS caregiver_name,
+            cg.hourly_rate,
+            average.average_rate
+        FROM caregiver_earnings e
+        JOIN caregiver cg ON e.caregiver_user_id = cg.caregiver_user_id
+        JOIN users u ON cg.caregiver_user_id = u.user_id
+        CROSS JOIN average
+        WHERE e.accepted_appointments > 0
+          AND cg.hourly_rate > average.average_rate
+        ORDER BY cg.hourly_rate DESC
+        """
+    ),
+    # 7 Total cost per caregiver (derived attribute hourly_rate * work_hours)
+    '7': ReportQuery(
+        "7. Total cost per caregiver for all accepted appointments:",
+        "Total Cost per Caregiver (hourly_rate * work_hours)",
+        """
+        SELECT 
+            e.caregiver_user_id,
+            u.given_name || ' ' || u.surname AS caregiver_name,
+            cg.hourly_rate,
+            e.accepted_hours AS total_hours,
+            e.accepted_cost AS total_cost
+        FROM caregiver_earnings e
+        JOIN caregiver cg ON e.caregiver_user_id = cg.caregiver_user_id
+        JOIN users u ON cg.caregiver_user_id = u.user_id
+        WHERE e.accepted_appointments > 0
+        ORDER BY total_cost DESC
+        """
+    ),
+    # 8 Query job_applications_view
+    '8': ReportQuery(
+        "Querying job_applications_view:",
+        "Job Applications View",
+        """
+        SELECT caregiver_user_id, job_id, date_applied,
+               applicant_name, required_caregiving_type
+        FROM job_applications_view
+        ORDER BY job_id, caregiver_user_id
+        """
+    ),
+}
+
+
+# Registered statements of REPORT_QUERIES, e.g. 'report_5_1' (see statements.py)
+REPORT_STATEMENTS = {key: statement(f"report_{key.replace('.', '_')}", query.sql)
+                     for key, query in REPORT_QUERIES.items()}
@@ -0,0 +1,165 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Query result and fragment cache
+
+A process-local LRU cache for the rows of read queries. Entries are keyed
+by SQL text, bound parameters and the current version of every table the
+query reads, so a committed write to any of those tables makes the old
+entries unreachable; they age out of the LRU instead of being searched
+for and deleted. Memory is bounded by an estimate of the cached rows'
+size in bytes. app.py keeps rendered table bodies in a second instance,
+keyed the same way by table version.
+
+The versions are the table_versions rows (migration 006), which triggers
+bump on every write whichever process makes it, so a write through one
+gunicorn worker, main.py or bulk_import.py invalidates the entries of
+every worker. app.py reads them once per request, before the request's
+queries, so an entry never holds rows older than its key.
+"""
+
+from collections import OrderedDict
+import re
+import sys
+import threading
+import time
+
+READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+# A write starts the statement, a data-modifying CTE "name AS (DELETE ...)"
+# or the main statement after the CTEs "...) DELETE ..."
+WRITE_TABLE = re.compile(
+    r'(?:^|[()])\s*(?:(INSERT)\s+INTO|(UPDATE)|(DELETE)\s+FROM|(REFRESH)\s+MATERIALIZED\s+VIEW'
+    r'(?:\s+CONCURRENTLY)?)\s+([A-Za-z_][A-Za-z0-9_]*)',
+    re.IGNORECASE
+)
+
+
+def tables_read(sql):
+    """Names following FROM/JOIN in a SELECT, e.g. {'users', 'caregiver'}"""
+    return frozenset(name.lower() for name in READ_TABLES.findall(sql))
+
+
+def tables_written(sql):
+    """(verb, table) pairs for the INSERT/UPDATE/DELETE/REFRESH parts of a statement"""
+    written = []
+    for match in WRITE_TABLE.finditer(sql):
+        verb = next(group for group in match.groups()[:4] if group)
+        written.append((verb.upper(), match.group(5).lower()))
+    return written
+
+
+def versions_of(versions, tables):
+    """
+    Sorted ((table, version), ...) of the given tables from a table name ->
+    version mapping, or None if one of them is not versioned (its cached
+    entries could never be invalidated).
+    """
+    if not all(table in versions for table in tables):
+        return None
+    return tuple((table, versions[table]) for table in sorted(tables))
+
+
+class RecentWrites:
+    """
+    When this process last wrote each table, so reads of it can avoid a
+    replica that may not have the write yet.
+
+    dependents maps a table to the tables whose rows a DELETE on it also
+    removes (see purge.CASCADE_DELETES); those are recorded along with it.
+    """
+
+    def __init__(self, dependents=None):
+        self.lock = threading.Lock()
+        self.written_at = {}
+        self.dependents = dependents or {}
+
+    def record(self, table, cascade=False):
+        with self.lock:
+            pending = [table]
+            seen = set()
+            while pending:
+                name = pending.pop()
+                if name in seen:
+                    continue
+                seen.add(name)
+                self.written_at[name] = time.monotonic()
+                if cascade:
+                    pending.extend(self.dependents.get(name, ()))
+
+    def changed_within(self, tables, seconds):
+        """True if any of the tables was written in the last seconds"""
+        since = time.monotonic() - seconds
+        with self.lock:
+            return any(self.written_at.get(table, since) > since for table in tables)
+
+
+def estimate_size(rows):
+    """Rough size in bytes of a list of result rows"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += 64 + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU bounded by the estimated bytes of its values"""
+
+    def __init__(self, max_bytes, max_age=None, sizeof=estimate_size):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # key -> (value, size, stored_at)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key or None; a hit moves the entry to the front"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.max_age and time.monotonic() - entry[2] > self.max_age:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, size, time.monotonic())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'max_age_s': self.max_age,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,165 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Startup benchmark
+
+Starts gunicorn with and without --preload (GUNICORN_PRELOAD) and reports,
+for each mode, how long it takes until the first and until every worker
+answers /ready, the latency of the first list page each worker serves,
+and the memory of the master and workers (proportional set size, so pages
+shared after a preloading fork are counted once).
+
+Usage:
+    python startup_benchmark.py
+    python startup_benchmark.py --workers 4 --runs 5 --output startup.json
+"""
+
+from collections import namedtuple
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+MODES = {'preload': '1', 'no-preload': '0'}
+FIRST_PAGE = '/users'
+
+StartupRun = namedtuple('StartupRun', ['first_ready_s', 'all_ready_s', 'first_page_ms',
+                                       'pss_mb'])
+
+
+def get(url, timeout=5):
+    """(status, body) of a GET, without raising on HTTP errors"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def process_tree(pid):
+    """pid and the pids of its children (Linux /proc)"""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [pid] + [int(child) for child in f.read().split()]
+    except OSError:
+        return [pid]
+
+
+def pss_mb(pids):
+    """Summed proportional set size in MiB, or None where /proc is unavailable"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        except (OSError, StopIteration):
+            return None
+    return round(total / 1024, 1)
+
+
+def start_once(mode, workers, port, timeout):
+    """Start gunicorn in one mode, measure it, stop it"""
+    env = dict(os.environ, GUNICORN_PRELOAD=MODES[mode])
+    base = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:create_app()'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        first_ready = None
+        ready = set()
+        while len(ready) < workers:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f'{mode}: only {len(ready)} of {workers} worker(s) '
+                                   f'ready after {timeout:g}s')
+            if server.poll() is not None:
+                raise RuntimeError(f'{mode}: gunicorn exited with {server.returncode}')
+            try:
+                status, body = get(base + '/ready', timeout=1)
+            except OSError:
+                time.sleep(0.01)
+                continue
+            if status == 200:
+                ready.add(json.loads(body)['pid'])
+                if first_ready is None:
+                    first_ready = time.perf_counter() - started
+            else:
+                time.sleep(0.01)
+        all_ready = time.perf_counter() - started
+
+        # One page per worker, each the first that worker renders
+        first_page = []
+        for _ in range(workers):
+            page_started = time.perf_counter()
+            get(base + FIRST_PAGE)
+            first_page.append((time.perf_counter() - page_started) * 1000)
+        memory = pss_mb(process_tree(server.pid))
+        return StartupRun(first_ready, all_ready, first_page, memory)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def summarise(runs):
+    result = {
+        'runs': len(runs),
+        'first_ready_s': round(statistics.median(run.first_ready_s for run in runs), 3),
+        'all_ready_s': round(statistics.median(run.all_ready_s for run in runs), 3),
+        'first_page_ms': round(statistics.median(ms for run in runs
+                                                 for ms in run.first_page_ms), 2),
+    }
+    memory = [run.pss_mb for run in runs if run.pss_mb is not None]
+    result['pss_mb'] = round(statistics.median(memory), 1) if memory else None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare gunicorn startup with and '
+                                                 'without preload')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--runs', type=int, default=3, help='starts per mode (default 3)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='seconds to wait for every worker to be ready (default 60)')
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = {'workers': args.workers, 'modes': {}}
+    try:
+        for mode in MODES:
+            print(f"\n{mode} ({args.workers} workers)")
+            runs = []
+            for run in range(args.runs):
+                runs.append(start_once(mode, args.workers, args.port, args.timeout))
+                print(f"  run {run + 1}: first ready {runs[-1].first_ready_s:.3f}s, "
+                      f"all ready {runs[-1].all_ready_s:.3f}s, first page "
+                      f"{statistics.median(runs[-1].first_page_ms):.1f} ms, "
+                      f"PSS {runs[-1].pss_mb} MiB")
+            results['modes'][mode] = summarise(runs)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    print(f"\n{'mode':<12} {'first ready':>12} {'all ready':>10} {'first page':>11} {'PSS':>9}")
+    for mode, summary in results['modes'].items():
+        print(f"{mode:<12} {summary['first_ready_s']:>11.3f}s {summary['all_ready_s']:>9.3f}s "
+              f"{summary['first_page_ms']:>8.1f} ms {summary['pss_mb'] or 0:>6.1f} MiB")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+CSCI 341 - Database Management Systems
+Online Caregivers Platform - Statement registry
+
+Every statement the web app and main.py run is registered here once, by
+name, as a Statement: its SQL, the text() clause built from it and the
+tables it reads. Callers execute the clause instead of building text()
+from a literal on every request, so the bind parameters are parsed once
+and SQLAlchemy's compiled cache is hit with the same object each time.
+
+Statements composed at run time (a list page plus its seek condition, the
+?fields= of the JSON API) are registered by derive() under a base name
+and a hash of their SQL, up to MAX_STATEMENTS in all.
+
+With DB_PREPARE_STATEMENTS=1 (off by default) install_prepare(engine)
+also makes registered statements server-side prepared statements: the
+first time a pooled connection runs one it sends PREPARE <name> AS ...,
+and every later run is EXECUTE <name>(...), so PostgreSQL parses and
+plans it once per connection rather than once per request (after five
+executions it may keep a generic plan; see plan_cache_mode). A statement
+PostgreSQL cannot prepare, e.g. because it cannot infer a parameter's
+type, is remembered and runs unprepared. Prepared statements belong to
+the server session, so leave this off behind a transaction-pooling
+PgBouncer.
+"""
+
+from collections import namedtuple
+import hashlib
+import os
+import re
+import threading
+
+import psycopg2
+from sqlalchemy import event, text
+
+from result_cache import tables_read
+
+PREPARE_STATEMENTS = os.environ.get('DB_PREPARE_STATEMENTS', '0').lower() not in (
+    '0', 'false', 'no')
+MAX_STATEMENTS = int(os.environ.get('DB_MAX_STATEMENTS', 2000))
+
+# A compiled psycopg2 statement: escaped percent signs and %(name)s parameters
+PLACEHOLDER = re.compile(r'%%|%\((\w+)\)s')
+IN_FAILED_TRANSACTION = '25P02'
+# What PREPARE accepts; REFRESH MATERIALIZED VIEW and other utility statements run as they are
+PREPARABLE = re.compile(r'^\s*(?:SELECT|INSERT|UPDATE|DELETE|WITH|VALUES)\b', re.IGNORECASE)
+
+# tables:     frozenset of the names the statement reads (see result_cache.tables_read)
+# preparable: whether PREPARE accepts it
+Statement = namedtuple('Statement', ['name', 'sql', 'clause', 'tables', 'preparable'])
+
+STATEMENTS = {}
+by_clause = {}   # id(clause) -> Statement, for the prepare hook
+derived = {}     # composed SQL -> Statement
+unpreparable = {}   # name -> PostgreSQL's error
+lock = threading.Lock()
+
+
+def statement(name, sql):
+    """Register sql under name and return its Statement; a name always means the same SQL"""
+    with lock:
+        existing = STATEMENTS.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f'Statement {name} is already registered with other SQL')
+            return existing
+        registered = Statement(name, sql, text(sql), tables_read(sql),
+                               bool(PREPARABLE.match(sql)))
+        if len(STATEMENTS) < MAX_STATEMENTS:
+            STATEMENTS[name] = registered
+            by_clause[id(registered.clause)] = registered
+        return registered
+
+
+def derive(base_name, sql):
+    """Statement for SQL composed at run time, named after base_name and the SQL's hash"""
+    registered = derived.get(sql)
+    if registered is None:
+        registered = statement(f"{base_name}_{hashlib.sha1(sql.encode()).hexdigest()[:10]}", sql)
+        if registered.name in STATEMENTS:
+            derived[sql] = registered
+    return registered
+
+
+def install_prepare(engine):
+    """Run registered statements as server-side prepared statements on engine's connections"""
+    event.listen(engine, 'before_cursor_execute', execute_prepared, retval=True)
+
+
+def execute_prepared(conn, cursor, statement, parameters, context, executemany):
+    registered = by_clause.get(id(getattr(context, 'invoked_statement', None)))
+    # A streamed result is a server-side cursor, DECLARE ... FOR takes no EXECUTE
+    if registered is None or not registered.preparable or executemany \
+            or registered.name in unpreparable or context.execution_options.get('stream_results'):
+        return statement, parameters
+    prepared = conn.connection.info.setdefault('prepared_statements', {})
+    names = prepared.get(registered.name)
+    if names is None:
+        names = prepare(cursor, registered.name, statement)
+        if names is None:
+            return statement, parameters
+        prepared[registered.name] = names
+    if not names:
+        return f'EXECUTE {registered.name}', parameters
+    return f"EXECUTE {registered.name}({', '.join(f'%({name})s' for name in names)})", parameters
+
+
+def prepare(cursor, name, statement):
+    """
+    PREPARE a compiled statement on the cursor's connection and return its
+    parameter names in $1, $2, ... order, or None if it cannot be prepared.
+    """
+    names = []
+
+    def placeholder(match):
+        if match.group(1) is None:
+            return '%'
+        if match.group(1) not in names:
+            names.append(match.group(1))
+        return f'${names.index(match.group(1)) + 1}'
+
+    body = PLACEHOLDER.sub(placeholder, statement)
+    # A failed PREPARE would abort the caller's transaction
+    savepoint = not cursor.connection.autocommit
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT prepare_statement")
+        cursor.execute(f"PREPARE {name} AS {body}")
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT prepare_statement")
+    except psycopg2.Error as e:
+        if e.pgcode == IN_FAILED_TRANSACTION:
+            return None
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+        with lock:
+            unpreparable[name] = (e.pgerror or str(e)).strip()
+        return None
+    return names
+
+
+def stats():
+    with lock:
+        return {
+            'registered': len(STATEMENTS),
+            'derived': len(derived),
+            'max_statements': MAX_STATEMENTS,
+            'prepare': PREPARE_STATEMENTS,
+            'unpreparable': dict(unpreparable),
+        }
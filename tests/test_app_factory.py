@@ -0,0 +1,37 @@
+"""
+create_app() builds each application with its own pools and caches, so
+tests and tools can run several side by side.
+"""
+
+from conftest import TEST_DATABASE_URL, add_user
+
+
+def test_each_app_gets_its_own_engines_and_caches(app):
+    from app import create_app
+    other = create_app({'DATABASE_URL': TEST_DATABASE_URL})
+    try:
+        ours, theirs = app.extensions['caregiver'], other.extensions['caregiver']
+        assert ours.engine is not theirs.engine
+        assert ours.result_cache is not theirs.result_cache
+        assert ours.fragment_cache is not theirs.fragment_cache
+        assert theirs.engine.url.render_as_string(hide_password=False) == TEST_DATABASE_URL
+    finally:
+        for pooled_engine in other.extensions['caregiver'].engines():
+            pooled_engine.dispose()
+
+
+def test_routes_are_registered_on_the_app(app, client, db):
+    assert 'web.users_list' in app.view_functions
+    add_user(db, 1)
+    response = client.get('/users')
+    assert b'user1@example.com' in response.data
+    # Metrics keep the route names they had before the blueprint
+    assert ('users_list', 'GET', '200') in app.extensions['caregiver'].request_metrics.requests
+
+
+def test_requests_use_the_serving_apps_cache(app, client, db):
+    add_user(db, 1)
+    cache = app.extensions['caregiver'].result_cache
+    misses = cache.misses
+    client.get('/users')
+    assert cache.misses > misses
@@ -0,0 +1,85 @@
+"""
+appointment_no_overlap (migration 008): a caregiver cannot hold two
+appointments whose slots overlap, unless one of them is declined.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from conftest import add_caregiver, add_member, execute
+
+MIGRATION = next((Path(__file__).resolve().parent.parent / 'migrations')
+                 .glob('008_*.sql')).read_text()
+
+
+@pytest.fixture
+def booked(db):
+    """Caregiver 1 is booked on 2025-01-10 from 10:00 to 12:00"""
+    add_caregiver(db, 1)
+    add_caregiver(db, 2)
+    add_member(db, 3)
+    book(db, 1, '10:00', 2)
+    return db
+
+
+def book(engine, caregiver_user_id, starts, hours, status='pending', day='2025-01-10'):
+    execute(engine, """
+        INSERT INTO appointment (caregiver_user_id, member_user_id, appointment_date,
+                                 appointment_time, work_hours, status)
+        VALUES (:caregiver, 3, :day, :starts, :hours, :status)
+    """, {'caregiver': caregiver_user_id, 'day': day, 'starts': starts, 'hours': hours,
+          'status': status})
+
+
+def test_overlapping_booking_is_rejected(booked):
+    with pytest.raises(IntegrityError, match='appointment_no_overlap'):
+        book(booked, 1, '11:30', 1)
+
+
+@pytest.mark.parametrize('caregiver_user_id, starts, hours, status, day', [
+    (1, '12:00', 1, 'pending', '2025-01-10'),   # starts when the other ends
+    (1, '08:00', 2, 'pending', '2025-01-10'),   # ends when the other starts
+    (1, '11:00', 2, 'declined', '2025-01-10'),
+    (1, '10:00', 2, 'pending', '2025-01-11'),
+    (2, '10:00', 2, 'pending', '2025-01-10'),
+])
+def test_non_overlapping_bookings_are_accepted(booked, caregiver_user_id, starts, hours,
+                                               status, day):
+    book(booked, caregiver_user_id, starts, hours, status, day)
+    assert execute(booked, "SELECT count(*) FROM appointment") == [(2,)]
+
+
+def test_reopening_a_declined_overlap_is_rejected(booked):
+    book(booked, 1, '11:00', 2, 'declined')
+    with pytest.raises(IntegrityError, match='appointment_no_overlap'):
+        execute(booked, "UPDATE appointment SET status = 'pending' WHERE status = 'declined'")
+
+
+def test_create_form_names_the_conflicting_appointment(booked, client):
+    response = client.post('/appointments/create', data={
+        'caregiver_user_id': '1', 'member_user_id': '3', 'appointment_date': '2025-01-10',
+        'appointment_time': '11:00', 'work_hours': '1', 'status': 'pending',
+    })
+    assert b'already booked at that time: appointment #1' in response.data
+
+
+def test_migration_lists_existing_overlaps_instead_of_declining_them(booked):
+    with booked.connect() as conn:
+        conn.execute(text("ALTER TABLE appointment DROP CONSTRAINT appointment_no_overlap"))
+        conn.execute(text("""
+            INSERT INTO appointment (appointment_id, caregiver_user_id, member_user_id,
+                                     appointment_date, appointment_time, work_hours, status)
+            VALUES (50, 1, 3, '2025-01-10', '11:00', 2, 'pending'),
+                   (51, 2, 3, '2025-01-10', '11:00', 2, 'pending')
+        """))
+        with pytest.raises(Exception) as raised:
+            conn.connection.cursor().execute(MIGRATION)
+        conn.rollback()
+    message = str(raised.value)
+    assert '1 pair(s) of appointments overlap' in message
+    assert '1 and 50 (caregiver 1)' in message
+    assert 'Decline or reschedule' in message
+    assert execute(booked, "SELECT count(*) FROM appointment WHERE status = 'declined'") == [(0,)]
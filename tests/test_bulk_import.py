@@ -0,0 +1,81 @@
+import io
+
+from bulk_import import import_stream
+from conftest import add_caregiver, add_member, add_user, execute
+
+
+def run_import(engine, table, body, fmt='csv'):
+    rejects = io.StringIO()
+    report = import_stream(engine, table, io.StringIO(body), fmt, rejects)
+    return report, rejects.getvalue()
+
+
+def test_malformed_value_rejects_its_row_only(db):
+    add_user(db, 1)
+    add_user(db, 2)
+    add_user(db, 3)
+    report, rejects = run_import(db, 'caregiver', (
+        "caregiver_user_id,caregiving_type,hourly_rate\n"
+        "1,babysitter,12.50\n"
+        "2,babysitter,abc\n"
+        "x,elderly care,9\n"
+        "3,elderly care,9\n"
+    ))
+    assert report.rows_read == 4
+    assert report.rows_inserted == 2
+    assert report.rejected == {'invalid hourly_rate': 1, 'invalid caregiver_user_id': 1}
+    assert '2,babysitter,abc' in rejects
+    assert execute(db, "SELECT caregiver_user_id FROM caregiver ORDER BY 1") == [(1,), (3,)]
+
+
+def test_value_too_long_for_column_is_rejected(db):
+    report, _ = run_import(db, 'users', (
+        "email,given_name,surname,password\n"
+        f"a@example.com,{'x' * 101},Smith,pw\n"
+        "b@example.com,Bob,Smith,pw\n"
+    ))
+    assert report.rows_inserted == 1
+    assert report.rejected == {'invalid given_name': 1}
+
+
+def test_null_keys_are_not_duplicates(db):
+    report, _ = run_import(db, 'users', (
+        "user_id,email,given_name,surname,password\n"
+        ",a@example.com,Ann,Lee,pw\n"
+        ",b@example.com,Bob,Lee,pw\n"
+        "7,c@example.com,Cat,Lee,pw\n"
+        "7,d@example.com,Dan,Lee,pw\n"
+    ))
+    assert report.rows_inserted == 3
+    assert report.rejected == {'duplicate in file': 1}
+
+
+def test_foreign_keys_are_checked_set_wise(db):
+    add_user(db, 1)
+    report, _ = run_import(db, 'member', (
+        '{"member_user_id": 1, "house_rules": "No pets"}\n'
+        '{"member_user_id": 99, "house_rules": "None"}\n'
+    ), fmt='ndjson')
+    assert report.rows_inserted == 1
+    assert report.rejected == {'unknown member_user_id': 1}
+
+
+def test_overlaps_in_file_keep_the_first_row_of_each_chain(db):
+    add_caregiver(db, 1)
+    add_member(db, 2)
+    # A overlaps B and B overlaps C, but A and C do not overlap: once B is
+    # rejected for overlapping A, C is free
+    report, rejects = run_import(db, 'appointment', (
+        "caregiver_user_id,member_user_id,appointment_date,appointment_time,work_hours,status\n"
+        "1,2,2025-01-10,10:00,2,pending\n"
+        "1,2,2025-01-10,11:00,2,pending\n"
+        "1,2,2025-01-10,12:00,1,pending\n"
+        "1,2,2025-01-10,12:30,1,declined\n"
+    ))
+    assert report.rows_inserted == 3
+    assert report.rejected == {'overlaps an earlier row in file': 1}
+    assert '11:00' in rejects
+    assert execute(db, """
+        SELECT appointment_time::text FROM appointment
+        WHERE status <> 'declined' ORDER BY appointment_time
+    """) == [('10:00:00',), ('12:00:00',)]
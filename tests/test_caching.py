@@ -0,0 +1,62 @@
+"""
+The result cache, fragment cache and ETags must follow writes made by
+other processes: each test writes through its own connection, outside the
+app's sessions, like another gunicorn worker or a CLI tool would.
+"""
+
+from conftest import add_user, execute
+
+
+def test_other_process_update_reaches_cached_form_and_list(client, db):
+    add_user(db, 1)
+    assert b'user1@example.com' in client.get('/users/1/update').data
+    assert b'user1@example.com' in client.get('/users').data
+
+    execute(db, "UPDATE users SET email = 'renamed@example.com' WHERE user_id = 1")
+    assert b'renamed@example.com' in client.get('/users/1/update').data
+    listing = client.get('/users').data
+    assert b'renamed@example.com' in listing
+    assert b'user1@example.com' not in listing
+
+
+def test_other_process_delete_removes_cached_row(client, db):
+    add_user(db, 1)
+    add_user(db, 2)
+    assert b'user2@example.com' in client.get('/users').data
+    execute(db, "DELETE FROM users WHERE user_id = 2")
+    assert b'user2@example.com' not in client.get('/users').data
+
+
+def test_other_process_insert_changes_etag_and_body(client, db):
+    add_user(db, 1)
+    first = client.get('/users')
+    assert b'user1@example.com' in first.data
+    etag = first.headers['ETag']
+    assert client.get('/users', headers={'If-None-Match': etag}).status_code == 304
+
+    add_user(db, 2)
+    second = client.get('/users', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert b'user2@example.com' in second.data
+    assert second.headers['ETag'] != etag
+    assert client.get('/users', headers={'If-None-Match': second.headers['ETag']}).status_code == 304
+
+
+def test_unchanged_page_is_served_from_the_caches(app, client, db):
+    result_cache = app.extensions['caregiver'].result_cache
+    fragment_cache = app.extensions['caregiver'].fragment_cache
+    add_user(db, 1)
+    client.get('/users')
+    hits, fragment_hits = result_cache.hits, fragment_cache.hits
+    client.get('/users')
+    assert result_cache.hits == hits + 1
+    assert fragment_cache.hits == fragment_hits + 1
+
+
+def test_fragment_follows_other_process_writes_without_result_cache(client, db, monkeypatch):
+    import app as application
+    monkeypatch.setattr(application, 'RESULT_CACHE_BYTES', 0)
+    add_user(db, 1)
+    client.get('/users')
+    execute(db, "UPDATE users SET city = 'Shymkent' WHERE user_id = 1")
+    assert b'Shymkent' in client.get('/users').data
@@ -0,0 +1,100 @@
+"""
+The data-modifying CTEs of purge.CASCADE_DELETES, and the bulk delete
+route that runs them.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from conftest import add_caregiver, add_member, add_user, execute
+from purge import CASCADE_DELETES
+
+
+@pytest.fixture
+def platform(db):
+    """
+    Users 1 and 2 are caregivers, 3 and 4 members; every caregiver applied
+    to every job and has an appointment with every member
+    """
+    add_caregiver(db, 1)
+    add_caregiver(db, 2)
+    add_member(db, 3)
+    add_member(db, 4)
+    add_user(db, 5)
+    execute(db, """
+        INSERT INTO address (member_user_id, house_number, street, town)
+        VALUES (3, '1', 'Kabanbay Batyr', 'Astana'), (4, '2', 'Turan', 'Astana')
+    """)
+    execute(db, """
+        INSERT INTO job (job_id, member_user_id, required_caregiving_type)
+        VALUES (10, 3, 'babysitter'), (11, 4, 'babysitter')
+    """)
+    execute(db, """
+        INSERT INTO job_application (caregiver_user_id, job_id)
+        SELECT c, j FROM unnest(ARRAY[1, 2]) c, unnest(ARRAY[10, 11]) j
+    """)
+    execute(db, """
+        INSERT INTO appointment (caregiver_user_id, member_user_id, appointment_date,
+                                 appointment_time, work_hours, status)
+        SELECT c, m, DATE '2025-01-01' + c, TIME '08:00' + m * INTERVAL '1 hour', 1, 'pending'
+        FROM unnest(ARRAY[1, 2]) c, unnest(ARRAY[3, 4]) m
+    """)
+    return db
+
+
+def delete(engine, target, ids):
+    with engine.begin() as conn:
+        return conn.execute(text(CASCADE_DELETES[target]), {'ids': ids}).rowcount
+
+
+def counts(engine):
+    return execute(engine, """
+        SELECT (SELECT count(*) FROM users), (SELECT count(*) FROM caregiver),
+               (SELECT count(*) FROM member), (SELECT count(*) FROM address),
+               (SELECT count(*) FROM job), (SELECT count(*) FROM job_application),
+               (SELECT count(*) FROM appointment)
+    """)[0]
+
+
+def test_deleting_a_member_user_removes_everything_under_it(platform):
+    assert delete(platform, 'users', [3]) == 1
+    # users, caregiver, member, address, job, job_application, appointment
+    assert counts(platform) == (4, 2, 1, 1, 1, 2, 2)
+    assert execute(platform, "SELECT DISTINCT job_id FROM job_application") == [(11,)]
+
+
+def test_deleting_a_caregiver_keeps_the_user(platform):
+    assert delete(platform, 'caregivers', [1]) == 1
+    assert counts(platform) == (5, 1, 2, 2, 2, 2, 2)
+
+
+def test_deleting_a_job_removes_its_applications_only(platform):
+    assert delete(platform, 'jobs', [10]) == 1
+    assert counts(platform) == (5, 2, 2, 2, 1, 2, 4)
+
+
+def test_deleting_unrelated_ids_changes_nothing(platform):
+    before = counts(platform)
+    assert delete(platform, 'users', [99]) == 0
+    assert counts(platform) == before
+
+
+def test_bulk_delete_route(platform, client):
+    response = client.post('/users/bulk_delete', data={'ids': ['1', '5']},
+                           follow_redirects=True)
+    assert b'Deleted 2 user(s)' in response.data
+    assert counts(platform) == (3, 1, 2, 2, 2, 2, 2)
+
+
+@pytest.mark.parametrize('name, ids, bad', [
+    ('users', ['1', 'abc'], '&#34;abc&#34; is not a valid id'),
+    ('job_applications', ['1-10', '2'], '&#34;2&#34; is not a valid '
+                                        '&lt;caregiver_user_id&gt;-&lt;job_id&gt; pair'),
+    ('job_applications', ['1-x'], '&#34;1-x&#34; is not a valid'),
+])
+def test_bulk_delete_names_the_bad_id(platform, name, ids, bad, client):
+    before = counts(platform)
+    response = client.post(f'/{name}/bulk_delete', data={'ids': ids}, follow_redirects=True)
+    assert bad.encode() in response.data
+    assert b'not enough values to unpack' not in response.data
+    assert counts(platform) == before
@@ -0,0 +1,32 @@
+"""
+/export streams a query from a server-side cursor after the view has
+returned, outside the application context.
+"""
+
+import json
+
+from conftest import add_caregiver, add_user
+
+
+def test_csv_export_streams_every_row(client, db):
+    add_user(db, 1)
+    add_user(db, 2)
+    response = client.get('/export/users.csv')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'user_id,email,given_name,surname,city,phone_number,profile_description'
+    assert [line.split(',')[1] for line in lines[1:]] == ['user1@example.com',
+                                                          'user2@example.com']
+
+
+def test_ndjson_export_of_a_joined_view(client, db):
+    add_caregiver(db, 1, hourly_rate=12.5)
+    response = client.get('/export/caregivers.ndjson')
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(row['caregiver_user_id'], row['email']) for row in rows] == [
+        (1, 'user1@example.com')
+    ]
+
+
+def test_unknown_export_is_not_found(client, db):
+    assert client.get('/export/secrets.csv').status_code == 404
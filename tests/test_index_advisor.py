@@ -0,0 +1,26 @@
+"""
+The index advisor's statements collected without running the app: every
+report query of main.py sections 5-8, the section 4 purges and the
+registered statements, but no string that merely looks like SQL.
+"""
+
+import index_advisor
+from reports import REPORT_QUERIES
+
+
+def test_report_and_purge_queries_are_collected():
+    sources = {statement.source for statement in index_advisor.collect_static()}
+    assert {f'report {key}' for key in REPORT_QUERIES} <= sources
+    assert {'purge 4.1', 'purge 4.2', 'statement members_delete',
+            'statement booking_conflict'} <= sources
+
+
+def test_only_statements_are_collected():
+    for statement in index_advisor.collect_static():
+        assert len(statement.sql.split()) > 1, statement.source
+    assert not index_advisor.SQL_START.match('DELETE')
+
+
+def test_list_query_fragments_are_left_to_the_runtime_collection():
+    sources = {statement.source for statement in index_advisor.collect_static()}
+    assert 'statement users_page' not in sources
@@ -0,0 +1,79 @@
+"""
+job_application_summary (migration 009) must always equal the four-way
+join it replaced, whichever table a write goes to.
+"""
+
+import pytest
+
+from conftest import add_caregiver, add_member, execute
+
+SUMMARY = """
+    SELECT caregiver_user_id, job_id, date_applied, applicant_name,
+           required_caregiving_type, member_name
+    FROM job_application_summary ORDER BY job_id, caregiver_user_id
+"""
+
+JOIN = """
+    SELECT ja.caregiver_user_id, ja.job_id, ja.date_applied,
+           u.given_name || ' ' || u.surname,
+           j.required_caregiving_type,
+           m_u.given_name || ' ' || m_u.surname
+    FROM job_application ja
+    JOIN users u ON u.user_id = ja.caregiver_user_id
+    JOIN job j ON j.job_id = ja.job_id
+    LEFT JOIN users m_u ON m_u.user_id = j.member_user_id
+    ORDER BY ja.job_id, ja.caregiver_user_id
+"""
+
+
+@pytest.fixture
+def applications(db):
+    """Caregivers 1 and 2 applied to job 10 of member 3; caregiver 1 to job 11 too"""
+    add_caregiver(db, 1)
+    add_caregiver(db, 2)
+    add_member(db, 3)
+    execute(db, """
+        INSERT INTO job (job_id, member_user_id, required_caregiving_type)
+        VALUES (10, 3, 'babysitter'), (11, 3, 'elderly care')
+    """)
+    execute(db, """
+        INSERT INTO job_application (caregiver_user_id, job_id, date_applied)
+        VALUES (1, 10, '2025-01-01'), (2, 10, '2025-01-02'), (1, 11, '2025-01-03')
+    """)
+    return db
+
+
+def test_inserts_are_summarized(applications):
+    rows = execute(applications, SUMMARY)
+    assert len(rows) == 3
+    assert rows == execute(applications, JOIN)
+
+
+def test_deletes_leave_the_summary(applications):
+    execute(applications, "DELETE FROM job_application WHERE caregiver_user_id = 1")
+    assert execute(applications, SUMMARY) == execute(applications, JOIN)
+    assert len(execute(applications, SUMMARY)) == 1
+
+
+def test_renames_and_job_changes_reach_the_summary(applications):
+    execute(applications, "UPDATE users SET given_name = 'Ann' WHERE user_id IN (1, 3)")
+    execute(applications, "UPDATE job SET required_caregiving_type = 'playmate' WHERE job_id = 10")
+    execute(applications, "UPDATE job_application SET date_applied = '2025-02-01' WHERE job_id = 11")
+    rows = execute(applications, SUMMARY)
+    assert rows == execute(applications, JOIN)
+    assert ('Ann User', 'playmate', 'Ann User') == rows[0][3:]
+
+
+def test_truncate_empties_the_summary(applications):
+    execute(applications, "TRUNCATE job_application")
+    assert execute(applications, SUMMARY) == []
+
+
+def test_list_page_shows_a_new_application_at_once(applications, client):
+    assert b'elderly care' in client.get('/job_applications').data
+    execute(applications, "INSERT INTO job (job_id, member_user_id, required_caregiving_type) "
+                          "VALUES (12, 3, 'tutor')")
+    response = client.post('/job_applications/create',
+                           data={'caregiver_user_id': '2', 'job_id': '12'})
+    assert response.status_code == 302
+    assert b'tutor' in client.get('/job_applications').data
@@ -0,0 +1,76 @@
+"""
+Keyset pagination over a sort order with mixed directions: appointments
+are listed newest date first, then by time and id ascending.
+"""
+
+import pytest
+
+from conftest import add_caregiver, add_member, execute
+
+# (appointment_id, caregiver, date, time) in the order /appointments lists them
+ORDER = [
+    (4, 1, '2025-01-12', '09:00'),
+    (5, 1, '2025-01-11', '14:00'),
+    (6, 2, '2025-01-11', '14:00'),
+    (3, 1, '2025-01-10', '08:00'),
+    (1, 1, '2025-01-10', '10:00'),
+    (2, 2, '2025-01-10', '10:00'),
+    (7, 1, '2025-01-09', '07:00'),
+]
+
+
+@pytest.fixture
+def appointments(db):
+    add_caregiver(db, 1)
+    add_caregiver(db, 2)
+    add_member(db, 3)
+    for appointment_id, caregiver_user_id, day, starts in sorted(ORDER):
+        execute(db, """
+            INSERT INTO appointment (appointment_id, caregiver_user_id, member_user_id,
+                                     appointment_date, appointment_time, work_hours)
+            VALUES (:id, :caregiver, 3, :day, :starts, 1)
+        """, {'id': appointment_id, 'caregiver': caregiver_user_id, 'day': day,
+              'starts': starts})
+    return db
+
+
+def page(app, query=''):
+    from app import APPOINTMENT_KEYS, APPOINTMENTS_PAGE, fetch_page
+    with app.test_request_context(f'/appointments?page_size=2{query}'):
+        session = app.extensions['caregiver'].SessionLocal()
+        try:
+            return fetch_page(session, APPOINTMENTS_PAGE, APPOINTMENT_KEYS)
+        finally:
+            session.close()
+
+
+def ids(result):
+    return [row.appointment_id for row in result.rows]
+
+
+def test_seek_condition_bounds_the_leading_column():
+    from app import APPOINTMENT_KEYS, seek_condition
+    assert seek_condition(APPOINTMENT_KEYS) == (
+        'a.appointment_date <= :seek_0 AND ((a.appointment_date < :seek_0) OR '
+        '(a.appointment_date = :seek_0 AND a.appointment_time > :seek_1) OR '
+        '(a.appointment_date = :seek_0 AND a.appointment_time = :seek_1 '
+        'AND a.appointment_id > :seek_2))'
+    )
+
+
+def test_pages_forward_follow_the_mixed_sort_order(app, appointments):
+    pages = [page(app)]
+    while pages[-1].next_cursor:
+        pages.append(page(app, f'&after={pages[-1].next_cursor}'))
+    assert [ids(p) for p in pages] == [[4, 5], [6, 3], [1, 2], [7]]
+    assert pages[0].prev_cursor is None
+
+
+def test_pages_backward_return_the_same_pages(app, appointments):
+    last = page(app, '&after=2025-01-10,10:00:00,2')
+    assert ids(last) == [7] and last.next_cursor is None
+    pages = [last]
+    while pages[-1].prev_cursor:
+        pages.append(page(app, f'&before={pages[-1].prev_cursor}'))
+    assert [ids(p) for p in reversed(pages)] == [[4, 5], [6, 3], [1, 2], [7]]
+    assert pages[-1].prev_cursor is None
@@ -0,0 +1,106 @@
+"""
+MatchIndex keeps the refreshes the web app makes, also those that land
+while a rebuild is loading an older snapshot.
+"""
+
+import pytest
+
+from conftest import add_caregiver, add_member, execute
+from matching import CANDIDATES, Candidate, MatchIndex
+
+
+class Session:
+    """Answers the index's two queries from a list of candidates"""
+
+    def __init__(self, candidates, during_load=None):
+        self.candidates = candidates
+        self.during_load = during_load
+
+    def execute(self, clause, params=None):
+        if clause is CANDIDATES.clause:
+            if self.during_load:
+                self.during_load()
+            return list(self.candidates)
+        return [c for c in self.candidates if c.caregiver_user_id in params['ids']]
+
+
+def candidate(caregiver_user_id, hourly_rate, city='Astana'):
+    return Candidate(caregiver_user_id, 'Test', 'User', f'user{caregiver_user_id}@example.com',
+                     city, 'babysitter', hourly_rate, 0)
+
+
+def matched(index, session, city='Astana'):
+    return [(c.caregiver_user_id, c.hourly_rate)
+            for c in index.matches(session, 'babysitter', city, 10)[1]]
+
+
+def test_refresh_reorders_and_drops_caregivers():
+    index = MatchIndex()
+    session = Session([candidate(1, 10), candidate(2, 20)])
+    assert matched(index, session) == [(1, 10), (2, 20)]
+    index.refresh(Session([candidate(1, 30)]), [1, 2])
+    assert matched(index, session) == [(1, 30)]
+
+
+def test_refresh_during_a_build_survives_the_swap():
+    index = MatchIndex()
+    written = Session([candidate(1, 25, city='Almaty')])
+    # The rebuild reads the caregiver as it was; the refresh lands meanwhile
+    loading = Session([candidate(1, 10), candidate(2, 20)],
+                      during_load=lambda: index.refresh(written, [1]))
+    index.build(loading)
+    assert matched(index, loading) == [(2, 20)]
+    assert matched(index, loading, city='Almaty') == [(1, 25)]
+    assert index.pending == []
+
+
+def test_refresh_before_the_first_build_is_left_to_it():
+    index = MatchIndex()
+    index.refresh(Session([candidate(1, 25)]), [1])
+    assert index.stats()['refreshes'] == 0
+
+
+@pytest.fixture
+def booked(app, client, db):
+    """Caregiver 1 has an accepted appointment with member 2 and one with 3; the index is built"""
+    add_caregiver(db, 1)
+    add_member(db, 2)
+    add_member(db, 3)
+    execute(db, """
+        INSERT INTO appointment (appointment_id, caregiver_user_id, member_user_id,
+                                 appointment_date, appointment_time, work_hours, status)
+        VALUES (1, 1, 2, '2025-01-10', '10:00', 2, 'accepted'),
+               (2, 1, 3, '2025-01-11', '10:00', 2, 'accepted')
+    """)
+    state = app.extensions['caregiver']
+    with state.SessionLocal() as session:
+        state.match_index.build(session)
+    assert accepted(app, 1) == 2
+    return client
+
+
+def accepted(app, caregiver_user_id):
+    """Accepted appointments of a caregiver as the app's match index has them"""
+    entries = app.extensions['caregiver'].match_index.groups.values()
+    return next(c.accepted_appointments for group in entries for _, c in group
+                if c.caregiver_user_id == caregiver_user_id)
+
+
+@pytest.mark.parametrize('path, data', [
+    ('/members/2/delete', None),
+    ('/members/bulk_delete', {'ids': ['2']}),
+    ('/users/bulk_delete', {'ids': ['2']}),
+    ('/appointments/1/delete', None),
+    ('/appointments/bulk_delete', {'ids': ['1']}),
+])
+def test_deleting_appointments_refreshes_their_caregiver(app, booked, path, data):
+    assert booked.post(path, data=data).status_code == 302
+    assert accepted(app, 1) == 1
+
+
+def test_declining_an_appointment_refreshes_its_caregiver(app, booked):
+    booked.post('/appointments/1/update', data={
+        'appointment_date': '2025-01-10', 'appointment_time': '10:00', 'work_hours': '2',
+        'status': 'declined',
+    })
+    assert accepted(app, 1) == 1
@@ -0,0 +1,54 @@
+from conftest import add_member, execute
+from purge import PurgeReport, format_report, purge
+
+
+def add_jobs(engine, member_user_id, job_ids):
+    execute(engine, """
+        INSERT INTO job (job_id, member_user_id, required_caregiving_type)
+        SELECT id, :member, 'babysitter' FROM unnest(CAST(:ids AS int[])) id
+    """, {'member': member_user_id, 'ids': job_ids})
+
+
+def test_purge_deletes_matching_rows_in_batches(db):
+    add_member(db, 1)
+    add_member(db, 2)
+    add_jobs(db, 1, [10, 11, 12])
+    add_jobs(db, 2, [20])
+    execute(db, "UPDATE users SET given_name = 'Amina' WHERE user_id = 1")
+    reports = []
+    report = purge(db, 'test', 'jobs', "u.given_name = 'Amina'", batch_size=2,
+                   progress=reports.append)
+    assert (report.batches, report.rows_deleted, report.resumed) == (2, 3, False)
+    assert [r.rows_deleted for r in reports] == [2, 3]
+    assert execute(db, "SELECT job_id FROM job") == [(20,)]
+
+
+def test_batches_are_timed_without_the_view_refresh(db):
+    add_member(db, 1)
+    add_jobs(db, 1, [10])
+    report = purge(db, 'test', 'jobs', 'true')
+    # job_applications_view is a plain view over the summary table since 009
+    assert report.refresh_seconds == 0.0
+    assert 'refreshed' not in format_report(report)
+
+
+def test_report_shows_the_refresh_separately():
+    report = PurgeReport('test', 'jobs', 2, 1000, 0.5, False, 1.25)
+    assert format_report(report) == (
+        "Deleted 1000 job(s) in 2 batch(es), 0.50s (2,000 rows/sec), "
+        "then refreshed job_applications_view in 1.25s"
+    )
+
+
+def test_unfinished_purge_resumes_after_the_last_batch(db):
+    add_member(db, 1)
+    add_jobs(db, 1, [10, 11, 12])
+    execute(db, """
+        INSERT INTO purge_job (name, target, predicate, last_id)
+        VALUES ('test', 'jobs', 'true', 11)
+        ON CONFLICT (name) DO UPDATE
+        SET target = 'jobs', predicate = 'true', last_id = 11, finished_at = NULL
+    """)
+    report = purge(db, 'test', 'jobs', 'true')
+    assert (report.rows_deleted, report.resumed) == (1, True)
+    assert execute(db, "SELECT job_id FROM job ORDER BY job_id") == [(10,), (11,)]
@@ -0,0 +1,143 @@
+"""
+Report jobs live in report_job and run in a worker process: the tests
+submit through the web app or the store functions and run the worker's
+threads in the test process.
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import report_jobs
+from conftest import add_caregiver, add_member, execute
+from report_jobs import ReportWorker
+from statements import statement
+
+
+@pytest.fixture
+def store(db):
+    execute(db, "TRUNCATE report_job RESTART IDENTITY")
+    return db
+
+
+@pytest.fixture
+def worker(store):
+    from database import DATABASE_URL
+    report_engine = create_engine(DATABASE_URL, pool_size=2, max_overflow=0)
+    yield ReportWorker(store, report_engine, workers=1, poll=0.05)
+    report_engine.dispose()
+
+
+@pytest.fixture
+def sleep_report(monkeypatch):
+    import reports
+    monkeypatch.setitem(reports.REPORT_STATEMENTS, 'sleep',
+                        statement('report_sleep', "SELECT pg_sleep(5)"))
+    return 'sleep'
+
+
+def test_ids_are_unique_and_jobs_shared_through_the_table(store):
+    ids = [report_jobs.submit(store, '6.3', 10).id for _ in range(3)]
+    assert len(set(ids)) == 3
+    assert [job.id for job in report_jobs.recent(store)] == sorted(ids, reverse=True)
+    assert report_jobs.get(store, ids[0]).status == 'queued'
+
+
+def test_worker_runs_the_oldest_job_and_stores_its_rows(worker, store):
+    add_caregiver(store, 1, hourly_rate=12.5)
+    add_member(store, 2)
+    execute(store, """
+        INSERT INTO appointment (caregiver_user_id, member_user_id, appointment_date,
+                                 appointment_time, work_hours, status)
+        VALUES (1, 2, '2025-01-10', '10:00', 2, 'accepted')
+    """)
+    job = report_jobs.submit(store, '6.3', 10)
+    assert worker.run_next()
+    assert not worker.run_next()
+    done = report_jobs.get(store, job.id, rows=True)
+    assert (done.status, done.server, done.row_count) == ('done', 'primary', 1)
+    assert done.columns == ['average_hourly_rate'] and done.rows == [[12.5]]
+
+
+def test_results_download_from_any_web_worker(worker, store, client):
+    response = client.post('/reports', json={'query': '6.3'})
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+    assert client.get(f'/reports/{job_id}/result.csv').status_code == 409
+    worker.run_next()
+    assert client.get(f'/reports/{job_id}').get_json()['status'] == 'done'
+    assert client.get(f'/reports/{job_id}/result.csv').data.splitlines() == [
+        b'average_hourly_rate', b'""'
+    ]
+    assert client.get(f'/reports/{job_id}/result.json').get_json()['rows'] == [[None]]
+
+
+def test_cancelled_queued_job_is_not_run(worker, store):
+    job = report_jobs.submit(store, '6.3', 10)
+    assert report_jobs.cancel(store, job.id)
+    assert not worker.run_next()
+    assert report_jobs.get(store, job.id).status == 'cancelled'
+    assert not report_jobs.cancel(store, job.id)
+
+
+def test_running_job_is_cancelled_on_its_backend(worker, store, sleep_report):
+    job = report_jobs.submit(store, sleep_report, 10)
+    thread = threading.Thread(target=worker.run_next)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while execute(store, "SELECT backend_pid FROM report_job WHERE job_id = :id",
+                  {'id': job.id}) == [(None,)] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert report_jobs.cancel(store, job.id)
+    thread.join(5)
+    cancelled = report_jobs.get(store, job.id)
+    assert cancelled.status == 'cancelled'
+    assert cancelled.seconds < 5
+
+
+def test_statement_timeout(worker, store, sleep_report):
+    job = report_jobs.submit(store, sleep_report, 0.2)
+    worker.run_next()
+    timed_out = report_jobs.get(store, job.id)
+    assert (timed_out.status, timed_out.error) == ('timeout', 'Exceeded 0.2s')
+
+
+def test_job_of_a_stopped_worker_is_failed(worker, store):
+    job = report_jobs.submit(store, '6.3', 10)
+    # Claimed by a worker that died before finishing: running, but unlocked
+    execute(store, "UPDATE report_job SET status = 'running' WHERE job_id = :id", {'id': job.id})
+    assert not worker.run_next()
+    failed = report_jobs.get(store, job.id)
+    assert (failed.status, failed.error) == ('failed', 'The report worker stopped while running it')
+
+
+def test_old_finished_jobs_are_forgotten(store):
+    for _ in range(3):
+        report_jobs.submit(store, '6.3', 10)
+    execute(store, "UPDATE report_job SET status = 'done'")
+    report_jobs.submit(store, '6.3', 10, max_jobs=1)
+    assert [job.status for job in report_jobs.recent(store)] == ['queued', 'done']
+
+
+def test_cancel_while_the_worker_records_the_result_wins(worker, store):
+    job = report_jobs.submit(store, '6.3', 10)
+    execute(store, "UPDATE report_job SET status = 'running' WHERE job_id = :id", {'id': job.id})
+    claimed = execute(store, "SELECT job_id FROM report_job WHERE job_id = :id",
+                      {'id': job.id})[0]
+    # cancel() holds the row it has marked until the query is cancelled
+    with store.connect() as cancelling:
+        cancelling.execute(text("UPDATE report_job SET cancel_requested = true "
+                                "WHERE job_id = :id"), {'id': job.id})
+        with store.connect() as control:
+            finishing = threading.Thread(target=worker.finish, args=(
+                control, claimed, 'done', None, ['average_hourly_rate'], [(12.5,)], 0.1))
+            finishing.start()
+            finishing.join(0.3)
+            assert finishing.is_alive()
+            cancelling.commit()
+            finishing.join(5)
+    cancelled = report_jobs.get(store, job.id, rows=True)
+    assert (cancelled.status, cancelled.row_count, cancelled.rows) == ('cancelled', None, None)
+    assert not report_jobs.cancel(store, job.id)
@@ -0,0 +1,73 @@
+"""
+The statement registry: one Statement per name, derived statements named
+by their SQL, and server-side prepared execution with DB_PREPARE_STATEMENTS.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import statements
+from statements import derive, install_prepare, statement
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry for the test"""
+    for name in ('STATEMENTS', 'by_clause', 'derived', 'unpreparable'):
+        monkeypatch.setattr(statements, name, {})
+    return statements
+
+
+def test_a_name_always_means_the_same_sql(registry):
+    first = statement('user_by_id', "SELECT * FROM users u JOIN caregiver c ON true")
+    assert statement('user_by_id', first.sql) is first
+    assert first.tables == {'users', 'caregiver'} and first.preparable
+    with pytest.raises(ValueError, match='user_by_id is already registered'):
+        statement('user_by_id', "SELECT 1")
+
+
+def test_utility_statements_are_not_preparable(registry):
+    assert not statement('refresh', "REFRESH MATERIALIZED VIEW job_applications_view").preparable
+
+
+def test_derived_statements_are_named_by_their_sql(registry):
+    page = derive('users_page', "SELECT * FROM users ORDER BY user_id")
+    assert page.name.startswith('users_page_') and len(page.name) == len('users_page_') + 10
+    assert derive('users_page', page.sql) is page
+    assert derive('users_page', page.sql + ' DESC').name != page.name
+    assert registry.stats()['derived'] == 2
+
+
+def test_statements_past_the_limit_run_unregistered(registry, monkeypatch):
+    monkeypatch.setattr(statements, 'MAX_STATEMENTS', 1)
+    statement('first', "SELECT 1")
+    extra = derive('page', "SELECT 2")
+    assert extra.name not in registry.STATEMENTS
+    assert registry.derived == {}
+    assert derive('page', "SELECT 2").clause is not extra.clause
+
+
+@pytest.fixture
+def prepared_engine(engine, registry):
+    prepared = create_engine(engine.url, pool_size=1, max_overflow=0)
+    install_prepare(prepared)
+    yield prepared
+    prepared.dispose()
+
+
+def test_registered_statements_are_prepared_once_per_connection(prepared_engine):
+    answer = statement('test_answer', "SELECT CAST(:n AS int) + 1")
+    with prepared_engine.connect() as conn:
+        assert [conn.execute(answer.clause, {'n': n}).scalar() for n in (1, 2)] == [2, 3]
+        assert conn.execute(text(
+            "SELECT statement FROM pg_prepared_statements WHERE name = 'test_answer'"
+        )).fetchall() == [('PREPARE test_answer AS SELECT CAST($1 AS int) + 1',)]
+
+
+def test_unpreparable_statement_runs_as_it_is(prepared_engine, registry):
+    untyped = statement('test_untyped', "SELECT :value IS NULL")
+    with prepared_engine.begin() as conn:
+        assert conn.execute(untyped.clause, {'value': None}).scalar() is True
+        # The failed PREPARE did not abort the transaction
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert 'test_untyped' in registry.unpreparable